@@ -1,24 +1,89 @@
 import os
+import time
 from dotenv import load_dotenv
-from groq import Groq
+from groq import AsyncGroq, Groq
+
+from groq_client import (
+    AIError,
+    AIErrorKind,
+    AIRequestFailed,
+    AIResult,
+    CircuitBreaker,
+    RetryPolicy,
+    acreate_completion,
+    build_async_http_client,
+    build_http_client,
+    run_with_retries,
+)
+from fair_queue import BackgroundLoop, FairLimiter, SlotTimeout
+from instrumentation import METRICS, record_usage, span
+from response_cache import build_response_cache_from_env, make_cache_key
+from single_flight import SingleFlight
 
 load_dotenv()
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
 
-client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
+# Per-attempt timeout and the overall deadline for one call, including retries.
+GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "30"))
+GROQ_DEADLINE = float(os.getenv("GROQ_DEADLINE", "60"))
 
+RETRY_POLICY = RetryPolicy(
+    max_attempts=int(os.getenv("GROQ_MAX_ATTEMPTS", "3")),
+    base_delay=float(os.getenv("GROQ_RETRY_BASE_DELAY", "0.5")),
+    max_delay=float(os.getenv("GROQ_RETRY_MAX_DELAY", "8")),
+)
+BREAKER = CircuitBreaker(
+    failure_threshold=int(os.getenv("GROQ_BREAKER_THRESHOLD", "5")),
+    reset_timeout=float(os.getenv("GROQ_BREAKER_RESET", "30")),
+)
+
+# Requests to Groq in flight at once across all users, and the wait for a free slot.
+GROQ_CONCURRENCY = int(os.getenv("GROQ_CONCURRENCY", "8"))
+
+_POOL_LIMITS = {
+    "max_connections": int(os.getenv("GROQ_MAX_CONNECTIONS", "20")),
+    "max_keepalive": int(os.getenv("GROQ_MAX_KEEPALIVE", "10")),
+    "timeout": GROQ_TIMEOUT,
+}
+
+# Retries are handled by RETRY_POLICY, so the SDK's own retries are switched off.
+# `client` serves streams; `async_client` serves every non-streaming call.
+client = (
+    Groq(api_key=GROQ_API_KEY, max_retries=0, http_client=build_http_client(**_POOL_LIMITS))
+    if GROQ_API_KEY
+    else None
+)
+async_client = (
+    AsyncGroq(api_key=GROQ_API_KEY, max_retries=0, http_client=build_async_http_client(**_POOL_LIMITS))
+    if GROQ_API_KEY
+    else None
+)
+
+# Shared by sync and async callers; queued requests are served round-robin per user.
+LIMITER = FairLimiter(GROQ_CONCURRENCY)
+
+# async_client, its connection pool and the non-streaming IN_FLIGHT entries all live on this one loop.
+AI_LOOP = BackgroundLoop("groq-async")
+
+# None unless AI_CACHE_ENABLED is set, see response_cache.build_response_cache_from_env
+RESPONSE_CACHE = build_response_cache_from_env()
+
+# Deduplicates identical concurrent calls and streams; IN_FLIGHT.stats() shows how many were coalesced.
+IN_FLIGHT = SingleFlight()
+
+if RESPONSE_CACHE is not None:
+    METRICS.register_gauges("response_cache", RESPONSE_CACHE.stats)
+METRICS.register_gauges("llm_in_flight", lambda: IN_FLIGHT.stats(top=0))
+METRICS.register_gauges("llm_limiter", LIMITER.stats)
 
-def call_ai_model(messages, response_format: str | None = None) -> str:
-    """
-    messages: list of {"role": "system"|"user"|"assistant", "content": "..."}
-    Optionally force JSON-only output when response_format == "json_object".
-    Returns text or error string.
-    """
-    if client is None:
-        return "Groq API key not configured. Please set GROQ_API_KEY in .env."
 
+def _operation(response_format: str | None) -> str:
+    return "json" if response_format == "json_object" else "chat"
+
+
+def _completion_kwargs(messages, response_format: str | None) -> dict:
     kwargs = {
         "model": GROQ_MODEL,
         "messages": messages,
@@ -27,9 +92,205 @@ def call_ai_model(messages, response_format: str | None = None) -> str:
     if response_format == "json_object":
         # JSON mode for structured outputs
         kwargs["response_format"] = {"type": "json_object"}
+    return kwargs
+
+
+async def acall_ai_model_result(
+    messages,
+    response_format: str | None = None,
+    use_cache: bool = True,
+    deadline: float | None = None,
+    user: str | None = None,
+) -> AIResult:
+    """
+    Async call_ai_model_result. Safe to await from any event loop; the request itself
+    runs on AI_LOOP. `user` is the fair-queuing key (e.g. an email or session id).
+    deadline caps the total time, including the wait for a free slot and retries.
+    """
+    if async_client is None:
+        return AIResult(error=AIError(AIErrorKind.NOT_CONFIGURED))
+
+    request_key = make_cache_key(GROQ_MODEL, messages, response_format)
+    if use_cache and RESPONSE_CACHE is not None:
+        cached = RESPONSE_CACHE.get(request_key)
+        if cached is not None:
+            return AIResult(text=cached)
+
+    return await AI_LOOP.run_async(
+        _shared_request(request_key, messages, response_format, use_cache, deadline or GROQ_DEADLINE, user)
+    )
+
+
+async def _shared_request(request_key, messages, response_format, use_cache, deadline, user) -> AIResult:
+    # Identical requests already on their way to Groq share that one call.
+    result, _ = await IN_FLIGHT.do_async(
+        request_key,
+        lambda: _request(request_key, messages, response_format, use_cache, deadline, user),
+    )
+    return result
+
+
+async def _request(request_key, messages, response_format, use_cache, deadline, user) -> AIResult:
+    operation = _operation(response_format)
+    give_up_at = time.monotonic() + deadline
+
+    with span("llm_call", operation=operation) as labels:
+        try:
+            async with LIMITER.slot_async(user, timeout=deadline):
+                result = await acreate_completion(
+                    async_client,
+                    _completion_kwargs(messages, response_format),
+                    RETRY_POLICY,
+                    BREAKER,
+                    attempt_timeout=GROQ_TIMEOUT,
+                    deadline=max(0.0, give_up_at - time.monotonic()),
+                )
+        except SlotTimeout as e:
+            result = AIResult(error=AIError(AIErrorKind.TIMEOUT, str(e)))
+        labels["outcome"] = "ok" if result.ok else result.error.kind.value
+
+    record_usage(result.usage, GROQ_MODEL, operation)
+    if use_cache and RESPONSE_CACHE is not None and result.ok and result.text:
+        RESPONSE_CACHE.set(request_key, result.text)
+    return result
 
+
+async def acall_ai_model(
+    messages,
+    response_format: str | None = None,
+    use_cache: bool = True,
+    user: str | None = None,
+) -> str:
+    """
+    Async call_ai_model: returns text or a friendly error message.
+    """
+    result = await acall_ai_model_result(messages, response_format, use_cache, user=user)
+    if result.ok:
+        return result.text or ""
+    return result.error.user_message
+
+
+def call_ai_model_result(
+    messages,
+    response_format: str | None = None,
+    use_cache: bool = True,
+    deadline: float | None = None,
+    user: str | None = None,
+) -> AIResult:
+    """
+    Like call_ai_model, but returns an AIResult with a typed error instead of an error string.
+    deadline caps the total time spent on the call, retries included. Blocks the calling
+    thread while acall_ai_model_result runs on AI_LOOP.
+    """
+    return AI_LOOP.run(acall_ai_model_result(messages, response_format, use_cache, deadline, user))
+
+
+def call_ai_model(
+    messages,
+    response_format: str | None = None,
+    use_cache: bool = True,
+    user: str | None = None,
+) -> str:
+    """
+    messages: list of {"role": "system"|"user"|"assistant", "content": "..."}
+    Optionally force JSON-only output when response_format == "json_object".
+    Returns text or a friendly error message. Successful answers are cached when RESPONSE_CACHE is enabled.
+    """
+    result = call_ai_model_result(messages, response_format, use_cache, user=user)
+    if result.ok:
+        return result.text or ""
+    return result.error.user_message
+
+
+def stream_ai_model(
+    messages,
+    response_format: str | None = None,
+    use_cache: bool = True,
+    user: str | None = None,
+):
+    """
+    Streaming variant of call_ai_model: yields text deltas as Groq produces them.
+    Cached answers are yielded as a single chunk. A failure, before or after text
+    started, ends the stream with one AIError item instead of text, so callers can
+    show it without mixing it into the answer. Retries only happen before the first
+    delta arrives. Identical streams already in flight are shared instead of sent again.
+    """
+    if client is None:
+        yield AIError(AIErrorKind.NOT_CONFIGURED)
+        return
+
+    request_key = make_cache_key(GROQ_MODEL, messages, response_format)
+    if use_cache and RESPONSE_CACHE is not None:
+        cached = RESPONSE_CACHE.get(request_key)
+        if cached is not None:
+            yield cached
+            return
+
+    stream, _ = IN_FLIGHT.do_stream(
+        f"stream:{request_key}",
+        lambda: _limited_stream(messages, response_format, request_key if use_cache else None, user),
+    )
+    yield from stream
+
+
+def _limited_stream(messages, response_format: str | None, cache_key: str | None, user: str | None):
+    # Runs on IN_FLIGHT.do_stream's pump thread, which reads the stream to the end
+    # whether or not anyone is still reading, so the slot is held until Groq finishes.
+    # One deadline covers the slot wait and the request, as in _request.
+    give_up_at = time.monotonic() + GROQ_DEADLINE
+    try:
+        LIMITER.acquire(user, timeout=GROQ_DEADLINE)
+    except SlotTimeout as e:
+        yield AIError(AIErrorKind.TIMEOUT, str(e))
+        return
     try:
-        completion = client.chat.completions.create(**kwargs)
-        return completion.choices[0].message.content
+        yield from _stream_from_groq(messages, response_format, cache_key, max(0.0, give_up_at - time.monotonic()))
+    finally:
+        LIMITER.release()
+
+
+def _stream_from_groq(messages, response_format: str | None, cache_key: str | None, deadline: float):
+    kwargs = _completion_kwargs(messages, response_format)
+    kwargs["stream"] = True
+    operation = _operation(response_format)
+    started = time.perf_counter()
+    outcome = "ok"
+
+    parts: list[str] = []
+    try:
+        stream = run_with_retries(
+            lambda timeout: client.chat.completions.create(timeout=timeout, **kwargs),
+            RETRY_POLICY,
+            BREAKER,
+            attempt_timeout=GROQ_TIMEOUT,
+            deadline=deadline,
+        )
+        for chunk in stream:
+            # Groq reports token usage on the final chunk, under x_groq.
+            record_usage(getattr(getattr(chunk, "x_groq", None), "usage", None), GROQ_MODEL, operation)
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if not parts:
+                    METRICS.observe(
+                        "herpath_llm_first_token_seconds", time.perf_counter() - started, operation=operation
+                    )
+                parts.append(delta)
+                yield delta
+    except AIRequestFailed as e:
+        outcome = e.error.kind.value
+        yield e.error
+        return
     except Exception as e:
-        return f"Error calling Groq API: {e}"
+        outcome = AIErrorKind.CONNECTION.value
+        # The stream broke after it started; what was already shown stays the answer.
+        yield AIError(AIErrorKind.CONNECTION, detail=str(e))
+        return
+    finally:
+        METRICS.observe(
+            "herpath_llm_stream_seconds", time.perf_counter() - started, operation=operation, outcome=outcome
+        )
+
+    if cache_key is not None and RESPONSE_CACHE is not None and parts:
+        RESPONSE_CACHE.set(cache_key, "".join(parts))
@@ -0,0 +1,464 @@
+"""
+Headless JSON API over the same engines the Streamlit app uses.
+
+    uvicorn api_server:app --host 0.0.0.0 --port 8000
+    python api_server.py
+
+Endpoints (JSON bodies; "stream": true switches to NDJSON streaming):
+    POST /v1/roadmap        {profile, question, page?, page_size?, stream?}
+    POST /v1/opportunities  {interests?, education_level?, category?, ranking?, top_k?}
+    POST /v1/guidance       {profile, question, stream?}
+    POST /v1/support        {profile, history?, message, stream?}
+    GET  /healthz, GET /metrics
+
+The optional X-User-Id header is the fair-queuing key for model calls.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List
+
+from ai_client import acall_ai_model_result, stream_ai_model
+from groq_client import AIError
+from college_catalogue import get_college_catalogue
+from instrumentation import METRICS
+from intent import classify_intents
+from kb_retriever_women import filter_women_programs, get_women_programs_index
+from prompts import build_guidance_messages
+from resume import PROFILE_FIELDS, empty_profile
+from roadmap_engine import (
+    COLLEGE_PAGE_SIZE,
+    ROADMAP_CACHE,
+    roadmap_cache_key,
+    stream_dynamic_roadmap,
+    submit_dynamic_roadmap,
+)
+from support_context import SupportContextWindow, add_emergency_footer, mentions_self_harm
+
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+# Seconds an idle keep-alive connection stays open.
+API_KEEPALIVE = int(os.getenv("API_KEEPALIVE", "30"))
+# Whole-request limits: plain JSON responses, and streamed responses end to end.
+API_REQUEST_TIMEOUT = float(os.getenv("API_REQUEST_TIMEOUT", "60"))
+API_STREAM_TIMEOUT = float(os.getenv("API_STREAM_TIMEOUT", "120"))
+API_MAX_BODY = int(os.getenv("API_MAX_BODY", str(256 * 1024)))
+# Same role as app.ROADMAP_CONTEXT_DEADLINE.
+API_ROADMAP_CONTEXT_DEADLINE = float(os.getenv("API_ROADMAP_CONTEXT_DEADLINE", "2.5"))
+WOMEN_PROGRAMS_KB = os.getenv("WOMEN_PROGRAMS_KB", "women_programs_kb.json")
+
+# Threads that drive the synchronous streaming generators.
+_STREAM_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("API_STREAM_WORKERS", "32")),
+    thread_name_prefix="api-stream",
+)
+_DONE = object()
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request:
+    def __init__(self, scope: Dict[str, Any], body: Dict[str, Any]):
+        self.scope = scope
+        self.body = body
+        self.headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+
+    @property
+    def user(self) -> str:
+        client = self.scope.get("client") or ("", 0)
+        return self.headers.get("x-user-id") or client[0] or "anonymous"
+
+    def text(self, field: str, required: bool = False) -> str:
+        value = self.body.get(field, "")
+        if not isinstance(value, str):
+            raise HTTPError(400, f"'{field}' must be a string")
+        if required and not value.strip():
+            raise HTTPError(400, f"'{field}' is required")
+        return value
+
+    def integer(self, field: str, default: int | None, low: int = 1, high: int = 100) -> int | None:
+        value = self.body.get(field, default)
+        if value is None:
+            return None
+        if isinstance(value, bool) or not isinstance(value, int) or not low <= value <= high:
+            raise HTTPError(400, f"'{field}' must be an integer between {low} and {high}")
+        return value
+
+    def profile(self) -> Dict[str, Any]:
+        raw = self.body.get("profile") or {}
+        if not isinstance(raw, dict):
+            raise HTTPError(400, "'profile' must be an object")
+        profile = empty_profile()
+        profile.update({k: v for k, v in raw.items() if k in PROFILE_FIELDS})
+        return profile
+
+    @property
+    def streaming(self) -> bool:
+        return bool(self.body.get("stream"))
+
+
+class StreamingResponse:
+    """
+    NDJSON body produced by an async iterator of JSON-serializable objects.
+    """
+
+    def __init__(self, items: AsyncIterator[Any]):
+        self.items = items
+
+
+Handler = Callable[[Request], Awaitable[Any]]
+
+
+# ---------- helpers ----------
+
+
+async def iterate_in_thread(make_iterator: Callable[[], Iterator[Any]]) -> AsyncIterator[Any]:
+    """
+    Drive a blocking iterator on one _STREAM_EXECUTOR thread and yield its items on
+    the event loop. The same thread closes the iterator, after its current next()
+    returns, when the consumer stops early (timeout, disconnect).
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+
+    def put(item: Any, error: BaseException | None = None) -> None:
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, (item, error))
+        except RuntimeError:
+            # The loop is already closed; nobody is listening.
+            pass
+
+    def pump() -> None:
+        iterator = None
+        try:
+            iterator = make_iterator()
+            while not stop.is_set():
+                item = next(iterator, _DONE)
+                put(item)
+                if item is _DONE:
+                    return
+        except BaseException as e:
+            put(_DONE, e)
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    _STREAM_EXECUTOR.submit(pump)
+    try:
+        while True:
+            item, error = await queue.get()
+            if error is not None:
+                raise error
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+def _colleges_page(roadmap: Dict[str, Any] | None, page: int, page_size: int) -> Dict[str, Any]:
+    if not roadmap:
+        return {"items": [], "total": 0, "page": page, "pages": 0}
+    result = get_college_catalogue().search(
+        keywords=roadmap.get("college_keywords", []),
+        budget=roadmap.get("budget_preference") or None,
+        page=page,
+        page_size=page_size,
+    )
+    return {"items": result.items, "total": result.total, "page": result.page, "pages": result.pages}
+
+
+async def _answer(
+    messages: List[Dict[str, str]],
+    request: Request,
+    finish: Callable[[str], str] = str,
+    use_cache: bool = True,
+) -> Any:
+    """
+    One model answer, either as {"answer": ...} or streamed as {"delta": ...} lines
+    followed by {"done": true, "answer": ...}, or by one {"error": ...} line when the
+    model call fails.
+    """
+    if not request.streaming:
+        result = await acall_ai_model_result(messages, use_cache=use_cache, user=request.user)
+        if not result.ok:
+            raise HTTPError(503 if result.error.retryable else 502, result.error.user_message)
+        return {"answer": finish(result.text or "")}
+
+    async def items():
+        parts: List[str] = []
+        error = None
+        async for delta in iterate_in_thread(
+            lambda: stream_ai_model(messages, use_cache=use_cache, user=request.user)
+        ):
+            if isinstance(delta, AIError):
+                error = delta
+                break
+            parts.append(delta)
+            yield {"delta": delta}
+        answer = "".join(parts)
+        # finish() still applies after a failure (e.g. the support emergency footer).
+        final = finish(answer)
+        if final != answer:
+            yield {"delta": final[len(answer):]}
+        if error is not None:
+            yield {"error": error.user_message, "retryable": error.retryable}
+        else:
+            yield {"done": True, "answer": final}
+
+    return StreamingResponse(items())
+
+
+# ---------- endpoints ----------
+
+
+async def roadmap_endpoint(request: Request) -> Any:
+    profile = request.profile()
+    question = request.text("question", required=True)
+    page = request.integer("page", 1, high=1000)
+    page_size = request.integer("page_size", COLLEGE_PAGE_SIZE)
+
+    if not request.streaming:
+        # shield: a timeout or disconnect here must not cancel the Future other sessions share.
+        roadmap = await asyncio.shield(asyncio.wrap_future(submit_dynamic_roadmap(profile, question, user=request.user)))
+        if roadmap is None:
+            raise HTTPError(502, "Could not build a roadmap for this question, please try again.")
+        return {"roadmap": roadmap, "colleges": _colleges_page(roadmap, page, page_size)}
+
+    async def items():
+        async for stage in iterate_in_thread(lambda: stream_dynamic_roadmap(profile, question, user=request.user)):
+            yield {"stage": stage}
+        # The stream caches the full roadmap when it could be parsed.
+        roadmap = ROADMAP_CACHE.get(roadmap_cache_key(profile, question))
+        yield {"done": True, "roadmap": roadmap, "colleges": _colleges_page(roadmap, page, page_size)}
+
+    return StreamingResponse(items())
+
+
+async def opportunities_endpoint(request: Request) -> Any:
+    category = request.body.get("category")
+    if category is not None and not isinstance(category, str):
+        raise HTTPError(400, "'category' must be a string")
+    ranking = request.body.get("ranking")
+    if ranking not in (None, "substring", "bm25"):
+        raise HTTPError(400, "'ranking' must be 'substring' or 'bm25'")
+
+    programs = filter_women_programs(
+        get_women_programs_index(WOMEN_PROGRAMS_KB),
+        interests=request.text("interests"),
+        education_level=request.text("education_level"),
+        category=category or None,
+        ranking=ranking,
+        top_k=request.integer("top_k", None),
+    )
+    return {"programs": [dict(p) for p in programs]}
+
+
+async def guidance_endpoint(request: Request) -> Any:
+    profile = request.profile()
+    question = request.text("question", required=True)
+
+    roadmap_future = submit_dynamic_roadmap(profile, question, user=request.user)
+    intents = classify_intents(question)
+    try:
+        roadmap = await asyncio.wait_for(
+            asyncio.shield(asyncio.wrap_future(roadmap_future)), API_ROADMAP_CONTEXT_DEADLINE
+        )
+    except asyncio.TimeoutError:
+        # Keep going without college context; the roadmap still lands in the cache.
+        roadmap = None
+    colleges = _colleges_page(roadmap, 1, COLLEGE_PAGE_SIZE)["items"]
+
+    return await _answer(build_guidance_messages(profile, question, colleges, intents), request)
+
+
+async def support_endpoint(request: Request) -> Any:
+    profile = request.profile()
+    message = request.text("message", required=True)
+    history = request.body.get("history") or []
+    if not isinstance(history, list) or not all(
+        isinstance(m, dict) and m.get("role") in ("user", "assistant") and isinstance(m.get("content"), str)
+        for m in history
+    ):
+        raise HTTPError(400, "'history' must be a list of {role: user|assistant, content} objects")
+
+    messages = SupportContextWindow().build_messages(profile, history, message)
+    finish = add_emergency_footer if mentions_self_harm(message) else str
+    # Support conversations are private: never written to or replayed from the response cache.
+    return await _answer(messages, request, finish, use_cache=False)
+
+
+async def health_endpoint(request: Request) -> Any:
+    return {"status": "ok"}
+
+
+async def metrics_endpoint(request: Request) -> Any:
+    return METRICS.render_prometheus()
+
+
+ROUTES: Dict[tuple[str, str], Handler] = {
+    ("POST", "/v1/roadmap"): roadmap_endpoint,
+    ("POST", "/v1/opportunities"): opportunities_endpoint,
+    ("POST", "/v1/guidance"): guidance_endpoint,
+    ("POST", "/v1/support"): support_endpoint,
+    ("GET", "/healthz"): health_endpoint,
+    ("GET", "/metrics"): metrics_endpoint,
+}
+
+
+# ---------- ASGI plumbing ----------
+
+
+async def _read_body(receive) -> bytes:
+    chunks: List[bytes] = []
+    size = 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise HTTPError(499, "client disconnected")
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > API_MAX_BODY:
+            raise HTTPError(413, "request body too large")
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+def _parse_json(raw: bytes) -> Dict[str, Any]:
+    if not raw:
+        return {}
+    try:
+        body = json.loads(raw)
+    except ValueError:
+        raise HTTPError(400, "body must be valid JSON")
+    if not isinstance(body, dict):
+        raise HTTPError(400, "body must be a JSON object")
+    return body
+
+
+async def _send(send, status: int, body: bytes, content_type: str) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", content_type.encode("latin-1")),
+                (b"content-length", str(len(body)).encode("latin-1")),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_json(send, status: int, payload: Any) -> None:
+    await _send(send, status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json")
+
+
+async def _send_stream(send, response: StreamingResponse) -> None:
+    """
+    Chunked NDJSON. Past API_STREAM_TIMEOUT the stream ends with an {"error": ...} line,
+    since the status has already been sent.
+    """
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/x-ndjson; charset=utf-8")],
+        }
+    )
+    give_up_at = time.monotonic() + API_STREAM_TIMEOUT
+    items = response.items
+    try:
+        while True:
+            remaining = give_up_at - time.monotonic()
+            try:
+                item = await asyncio.wait_for(items.__anext__(), max(0.0, remaining))
+            except StopAsyncIteration:
+                break
+            except asyncio.TimeoutError:
+                item = {"error": "request timed out"}
+                await send({"type": "http.response.body", "body": _ndjson(item), "more_body": True})
+                break
+            await send({"type": "http.response.body", "body": _ndjson(item), "more_body": True})
+    finally:
+        await items.aclose()
+    await send({"type": "http.response.body", "body": b""})
+
+
+def _ndjson(item: Any) -> bytes:
+    return (json.dumps(item, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+async def _lifespan(receive, send) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            # Load the KB and catalogue up front so the first request does not pay for it.
+            get_women_programs_index(WOMEN_PROGRAMS_KB)
+            get_college_catalogue()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            _STREAM_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send) -> None:
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    route = (scope["method"], scope["path"].rstrip("/") or "/")
+    handler = ROUTES.get(route)
+    started = time.perf_counter()
+    status = 200
+    try:
+        if handler is None:
+            known_path = any(path == route[1] for _, path in ROUTES)
+            raise HTTPError(405 if known_path else 404, "method not allowed" if known_path else "not found")
+        request = Request(scope, _parse_json(await _read_body(receive)))
+        result = await asyncio.wait_for(handler(request), API_REQUEST_TIMEOUT)
+    except HTTPError as e:
+        status = e.status
+        if status != 499:
+            await _send_json(send, status, {"error": e.message})
+    except asyncio.TimeoutError:
+        status = 504
+        await _send_json(send, status, {"error": "request timed out"})
+    except Exception:
+        status = 500
+        await _send_json(send, status, {"error": "internal error"})
+        raise
+    else:
+        if isinstance(result, StreamingResponse):
+            await _send_stream(send, result)
+        elif isinstance(result, str):
+            await _send(send, 200, result.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8")
+        else:
+            await _send_json(send, 200, result)
+    finally:
+        METRICS.observe(
+            "herpath_api_request_seconds",
+            time.perf_counter() - started,
+            route=route[1] if handler else "unknown",
+            status=status,
+        )
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=API_HOST, port=API_PORT, timeout_keep_alive=API_KEEPALIVE)
@@ -1,21 +1,58 @@
 import base64
+import functools
+import hashlib
+import os
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from io import BytesIO
 
 import streamlit as st
 
-from ai_client import call_ai_model
+from ai_client import stream_ai_model
+from groq_client import AIError
 from prompts import (
-    build_guidance_system_prompt,
-    build_guidance_user_prompt,
-    build_support_system_prompt,
-    build_support_user_prompt,
+    build_guidance_messages,
+    build_help_system_prompt,
+    build_help_user_prompt,
 )
+from instrumentation import span, start_exporters_from_env
+from intent import classify_intents
 from kb_retriever_women import (
-    load_women_programs_kb,
     filter_women_programs,
     format_women_programs_for_display,
+    get_women_programs_index,
 )
-from roadmap_engine import generate_dynamic_roadmap, get_matching_colleges
+from resume import EDUCATION_LEVELS, FINANCIAL_OPTIONS, empty_profile, resume_cache_key
+from resume_service import RENDER_SERVICE, normalize_photo
+from support_context import SupportContextWindow, add_emergency_footer, mentions_self_harm
+from roadmap_engine import get_matching_colleges, stream_dynamic_roadmap, submit_dynamic_roadmap
+
+# How long the prose answer waits for the structured roadmap before going without college context.
+ROADMAP_CONTEXT_DEADLINE = 2.5
+
+
+def write_answer_stream(messages, use_cache: bool = True) -> tuple[str, str | None]:
+    """
+    Stream a model answer into the page. Returns the answer text and, if the call
+    failed, the message to show for it; the error is never part of the answer.
+    """
+    errors: list[str] = []
+
+    def deltas():
+        for item in stream_ai_model(messages, use_cache=use_cache, user=st.session_state.user_email):
+            if isinstance(item, AIError):
+                errors.append(item.user_message)
+                return
+            yield item
+
+    answer = st.write_stream(deltas())
+    if errors:
+        st.warning(errors[0])
+    return (answer if isinstance(answer, str) else ""), (errors[0] if errors else None)
+
+
+def render_chat_error(msg):
+    if msg.get("error"):
+        st.warning(msg["error"])
 
 
 def init_session():
@@ -34,24 +71,7 @@ def init_session():
 
     # Profile starts empty, not with fake 18 / 12th defaults
     if "profile" not in st.session_state:
-        st.session_state.profile = {
-            "name": "",
-            "age": 0,
-            "education_level": "",
-            "interests": "",
-            "location": "",
-            "financial_constraint": "",
-            "goals": "",
-            "college": "",
-            "degree": "",
-            "branch": "",
-            "cgpa": "",
-            "experience_summary": "",
-            "projects_summary": "",
-            "skills_summary": "",
-            "certifications_summary": "",
-            "extra_summary": "",
-        }
+        st.session_state.profile = empty_profile()
 
     if "profile_photo" not in st.session_state:
         st.session_state.profile_photo = None
@@ -62,6 +82,8 @@ def init_session():
         st.session_state.support_history = []
     if "mini_bot_history" not in st.session_state:
         st.session_state.mini_bot_history = []
+    if "support_context" not in st.session_state:
+        st.session_state.support_context = SupportContextWindow()
 
     if "current_page" not in st.session_state:
         st.session_state.current_page = "Home"
@@ -76,74 +98,70 @@ def init_session():
         st.session_state.help_input_value = ""
 
 
-def set_background(image_file: str):
-    try:
-        with open(image_file, "rb") as f:
-            data = base64.b64encode(f.read()).decode()
-        bg = f"""
+BACKGROUND_STYLE_TEMPLATE = """
         <style>
-        .stApp {{
+        .stApp {
             background-image: linear-gradient(
                     rgba(240, 235, 252, 0.90),
                     rgba(235, 230, 250, 0.95)
                 ),
-                url("data:image/png;base64,{data}");
+                url("__BACKGROUND_URL__");
             background-size: cover;
             background-position: center;
             background-attachment: fixed;
             color: #1e1535;
             font-size: 1rem;
-        }}
-        .her-card {{
+        }
+        .her-card {
             background-color: rgba(255, 255, 255, 0.98);
             padding: 1.4rem 1.6rem;
             border-radius: 14px;
             box-shadow: 0 3px 12px rgba(0,0,0,0.15);
             margin-bottom: 1rem;
             color: #1e1535;
-        }}
-        h1, h2, h3, h4, h5, h6 {{
+        }
+        h1, h2, h3, h4, h5, h6 {
             color: #24104f;
             font-weight: 700;
-        }}
-        .stMarkdown p {{
+        }
+        .stMarkdown p {
             font-size: 1rem;
-        }}
-        .stButton>button {{
+        }
+        .stButton>button {
             border-radius: 999px;
             padding: 0.35rem 0.9rem;
             border: 1px solid #b037a0;
             background-color: #ffffff;
             color: #24104f;
             font-size: 0.9rem;
-        }}
-        .stButton>button:hover {{
+        }
+        .stButton>button:hover {
             background-color: #f4e6ff;
             border-color: #8b2b7e;
-        }}
-        .stTabs [data-baseweb="tab-list"] button {{
+        }
+        .stTabs [data-baseweb="tab-list"] button {
             background-color: rgba(255, 255, 255, 0.6);
             color: #24104f;
             font-size: 0.95rem;
-        }}
-        .stTabs [data-baseweb="tab-list"] button[aria-selected="true"] {{
+        }
+        .stTabs [data-baseweb="tab-list"] button[aria-selected="true"] {
             background-color: #f4e6ff;
             color: #24104f;
             font-weight: 600;
-        }}
-        .roadmap-grid {{
+        }
+        .roadmap-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(230px, 1fr));
             gap: 1rem;
             margin-top: 0.8rem;
-        }}
-        .roadmap-card {{
+        }
+        .roadmap-card {
             background: #f8f2ff;
             border-radius: 12px;
             padding: 0.9rem 1rem;
             border: 1px solid #e1c9ff;
-        }}
-        .roadmap-badge {{
+        }
+        .roadmap-badge {
             display: inline-block;
             font-size: 0.75rem;
             padding: 0.1rem 0.5rem;
@@ -152,18 +170,103 @@ def set_background(image_file: str):
             color: #7a2c8b;
             border: 1px solid #d8b3ff;
             margin-bottom: 0.4rem;
-        }}
-        .roadmap-title {{
+        }
+        .roadmap-title {
             font-weight: 600;
             margin-bottom: 0.2rem;
             color: #2a174f;
-        }}
-        .roadmap-desc {{
+        }
+        .roadmap-desc {
             font-size: 0.9rem;
             margin-bottom: 0.3rem;
-        }}
+        }
         </style>
-        """
+"""
+
+# "inline" embeds the image as a data URI; "static" serves it from ./static
+# (needs server.enableStaticServing, see .streamlit/config.toml).
+BACKGROUND_MODE = os.getenv("HERPATH_BG_MODE", "inline")
+# Optional re-encoding of the background: max width in px (0 keeps the original size)
+# and "png"/"webp"/"jpeg" (empty keeps the original format).
+BACKGROUND_MAX_WIDTH = int(os.getenv("HERPATH_BG_MAX_WIDTH", "0"))
+BACKGROUND_FORMAT = os.getenv("HERPATH_BG_FORMAT", "")
+
+
+def _image_extension(data: bytes, image_file: str) -> str:
+    # The bundled background is a JPEG despite its .png name, so sniff the bytes first.
+    if data.startswith(b"\xff\xd8"):
+        return "jpeg"
+    if data.startswith(b"\x89PNG"):
+        return "png"
+    if data[8:12] == b"WEBP":
+        return "webp"
+    return os.path.splitext(image_file)[1].lstrip(".").lower() or "png"
+
+
+def _prepare_background_image(image_file: str, max_width: int, image_format: str) -> tuple[bytes, str]:
+    """
+    Return (image bytes, extension). Resizing / WebP needs Pillow; without it the
+    original file is used unchanged.
+    """
+    with open(image_file, "rb") as f:
+        raw = f.read()
+
+    ext = _image_extension(raw, image_file)
+    # "jpg" is a common spelling of Pillow's "JPEG" format name.
+    image_format = (image_format or ext).lower().replace("jpg", "jpeg")
+    if not max_width and image_format == ext:
+        return raw, ext
+
+    try:
+        from PIL import Image
+    except ImportError:
+        return raw, ext
+
+    Image.init()
+    if image_format.upper() not in Image.SAVE:
+        # Unknown or unsupported HERPATH_BG_FORMAT: serve the original file.
+        return raw, ext
+
+    try:
+        img = Image.open(BytesIO(raw))
+        if max_width and img.width > max_width:
+            img = img.resize((max_width, round(img.height * max_width / img.width)))
+        if image_format == "jpeg" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+
+        out = BytesIO()
+        img.save(out, format=image_format.upper())
+    except (OSError, ValueError):
+        return raw, ext
+    return out.getvalue(), image_format
+
+
+@functools.lru_cache(maxsize=8)
+def _background_css(image_file: str, mtime_ns: int, mode: str, max_width: int, image_format: str) -> str:
+    """
+    Build the full stylesheet once per process (and again only if the image changes).
+    """
+    data, ext = _prepare_background_image(image_file, max_width, image_format)
+
+    if mode == "static":
+        static_name = f"background_{mtime_ns}_{max_width}.{ext}"
+        static_path = os.path.join("static", static_name)
+        if not os.path.exists(static_path):
+            os.makedirs("static", exist_ok=True)
+            with open(static_path, "wb") as f:
+                f.write(data)
+        image_url = f"app/static/{static_name}"
+    else:
+        mime = f"image/{ext}"
+        image_url = f"data:{mime};base64,{base64.b64encode(data).decode()}"
+
+    return BACKGROUND_STYLE_TEMPLATE.replace("__BACKGROUND_URL__", image_url)
+
+
+def set_background(image_file: str):
+    try:
+        mtime_ns = os.stat(image_file).st_mtime_ns
+        bg = _background_css(image_file, mtime_ns, BACKGROUND_MODE, BACKGROUND_MAX_WIDTH, BACKGROUND_FORMAT)
         st.markdown(bg, unsafe_allow_html=True)
     except FileNotFoundError:
         pass
@@ -217,15 +320,6 @@ def get_profile():
     return st.session_state.profile
 
 
-def add_emergency_footer(text: str) -> str:
-    warning = (
-        "\n\n⚠️ If you feel you might hurt yourself or are in immediate danger, "
-        "please contact local emergency services or a trusted adult right now. "
-        "This tool cannot handle emergencies."
-    )
-    return text + warning
-
-
 def render_top_nav():
     left, mid1, mid2, right = st.columns([1, 4, 1, 1])
 
@@ -276,7 +370,14 @@ def render_profile_page():
     st.subheader("Profile photo (optional)")
     uploaded_photo = st.file_uploader("Upload a profile picture (JPG/PNG)", type=["jpg", "jpeg", "png"])
     if uploaded_photo is not None:
-        st.session_state.profile_photo = uploaded_photo.getvalue()
+        raw_photo = uploaded_photo.getvalue()
+        photo_digest = hashlib.sha256(raw_photo).hexdigest()
+        # Downscale once per new upload; the uploader keeps returning the same file on every rerun.
+        # A single thumbnail is cheaper inline than a round trip through the render pool.
+        if st.session_state.get("profile_photo_digest") != photo_digest:
+            with st.spinner("Preparing your photo..."):
+                st.session_state.profile_photo = normalize_photo(raw_photo)
+            st.session_state.profile_photo_digest = photo_digest
 
     if st.session_state.profile_photo:
         st.image(st.session_state.profile_photo, width=150, caption="Profile photo")
@@ -293,8 +394,8 @@ def render_profile_page():
         name = st.text_input("Name", value=profile["name"], key="profile_name")
         education_level = st.selectbox(
             "Education level",
-            ["", "10th", "12th / Inter", "Degree", "Working"],
-            index=["", "10th", "12th / Inter", "Degree", "Working"].index(profile["education_level"]),
+            EDUCATION_LEVELS,
+            index=EDUCATION_LEVELS.index(profile["education_level"]),
             key="profile_edu",
         )
         age = st.number_input(
@@ -312,10 +413,8 @@ def render_profile_page():
         location = st.text_input("Location (city/state)", profile["location"], key="profile_location")
         financial_constraint = st.selectbox(
             "Financial situation",
-            ["", "Need low-budget options", "Moderate", "Can afford higher fees"],
-            index=["", "Need low-budget options", "Moderate", "Can afford higher fees"].index(
-                profile["financial_constraint"]
-            ),
+            FINANCIAL_OPTIONS,
+            index=FINANCIAL_OPTIONS.index(profile["financial_constraint"]),
             key="profile_financial",
         )
         goals = st.text_area(
@@ -436,127 +535,39 @@ def render_profile_page():
     if st.button("Show Resume Preview"):
         st.markdown(resume_md)
 
-    # PDF generation
-    from reportlab.lib.pagesizes import A4
-    from reportlab.pdfgen import canvas
-    from reportlab.lib.utils import ImageReader
-
-    def build_resume_pdf():
-        buffer = BytesIO()
-        c = canvas.Canvas(buffer, pagesize=A4)
-        width, height = A4
-
-        # Start text a bit lower to avoid header collisions
-        y = height - 70
-
-        # Optional photo on the top-right
-        photo_size = 80
-        if st.session_state.get("profile_photo"):
-            try:
-                img = ImageReader(BytesIO(st.session_state.profile_photo))
-                c.drawImage(
-                    img,
-                    width - photo_size - 40,   # x
-                    height - photo_size - 40,  # y
-                    width=photo_size,
-                    height=photo_size,
-                    preserveAspectRatio=True,
-                    mask="auto",
-                )
-            except Exception:
-                # Ignore image errors
-                pass
-
-        x = 40  # text always from left
-
-        c.setFont("Helvetica-Bold", 16)
-        c.drawString(x, y, p.get("name", ""))
-        y -= 25
-        c.setFont("Helvetica", 11)
-        c.drawString(x, y, f"Email: {st.session_state.user_email}")
-        y -= 15
-        c.drawString(x, y, f"Location: {p.get('location','')}")
-        y -= 30
-
-        def section(title):
-            nonlocal y
-            if y < 80:
-                c.showPage()
-                y = height - 70
-            c.setFont("Helvetica-Bold", 13)
-            c.drawString(x, y, title)
-            y -= 18
-            c.setFont("Helvetica", 11)
-
-        def split_line(text, max_width, canv):
-            words = text.split()
-            if not words:
-                return [""]
-            lines = []
-            cur = words[0]
-            for w in words[1:]:
-                if canv.stringWidth(cur + " " + w, "Helvetica", 11) < max_width:
-                    cur += " " + w
-                else:
-                    lines.append(cur)
-                    cur = w
-            lines.append(cur)
-            return lines
-
-        def write_paragraph(text):
-            nonlocal y
-            max_width = width - 2 * x
-            for line in text.split("\n"):
-                for chunk in split_line(line, max_width, c):
-                    if y < 60:
-                        c.showPage()
-                        y = height - 70
-                        c.setFont("Helvetica", 11)
-                    c.drawString(x, y, chunk)
-                    y -= 14
-            y -= 8
-
-        section("Education")
-        edu = f"{p.get('college','')} — {p.get('degree','')} in {p.get('branch','')} | CGPA: {p.get('cgpa','')}"
-        write_paragraph(edu)
-
-        section("Experience")
-        write_paragraph(p.get("experience_summary", ""))
-
-        section("Projects")
-        write_paragraph(p.get("projects_summary", ""))
-
-        section("Technical Skills")
-        write_paragraph(p.get("skills_summary", ""))
-
-        section("Certifications & Achievements")
-        write_paragraph(p.get("certifications_summary", ""))
-
-        section("Additional")
-        extra_text = (
-            f"Financial situation: {p.get('financial_constraint','')}. "
-            f"Goals: {p.get('goals','')}. "
-            f"Extra: {p.get('extra_summary','')}."
+    # PDF generation is lazy: only build it when she asks for it. It runs in the
+    # render service's process pool and the cached bytes are reused while the
+    # profile and photo stay the same.
+    resume_key = resume_cache_key(p, st.session_state.user_email, st.session_state.profile_photo)
+    pdf_future = st.session_state.get("resume_pdf_future")
+    if st.session_state.get("resume_pdf_key") != resume_key or pdf_future is None:
+        if st.button("Prepare Resume PDF"):
+            st.session_state.resume_pdf_key = resume_key
+            st.session_state.resume_pdf_future = RENDER_SERVICE.submit_pdf(
+                p, st.session_state.user_email, st.session_state.profile_photo
+            )
+            st.rerun()
+    elif not pdf_future.done():
+        st.info("Your resume PDF is being prepared...")
+        if st.button("Check again"):
+            st.rerun()
+    elif pdf_future.exception() is not None:
+        st.error("The resume PDF could not be created. Please try again.")
+        st.session_state.resume_pdf_future = None
+    else:
+        st.download_button(
+            "Download Resume (PDF)",
+            data=pdf_future.result(),
+            file_name="resume.pdf",
+            mime="application/pdf",
         )
-        write_paragraph(extra_text)
-
-        c.save()
-        buffer.seek(0)
-        return buffer.getvalue()
-
-    pdf_bytes = build_resume_pdf()
-    st.download_button(
-        "Download Resume (PDF)",
-        data=pdf_bytes,
-        file_name="resume.pdf",
-        mime="application/pdf",
-    )
 
     st.markdown("---")
     if st.button("Logout"):
         st.session_state.logged_in = False
         st.session_state.guidance_history = []
         st.session_state.support_history = []
+        st.session_state.support_context.reset()
         st.session_state.mini_bot_history = []
         st.rerun()
 
@@ -591,103 +602,29 @@ def render_home_page(women_kb, profile):
             st.session_state.guidance_history = []
 
         if send and user_input.strip():
-            system_prompt = build_guidance_system_prompt()
-
-            enriched_question = (
-                "User question: "
-                + user_input
-                + "\n\nYou must give a fresh roadmap each time in paragraph form, not bullet points. "
-                  "Adapt strongly to what she typed now. "
-                  "If she mentions arts, dance, singing, crafts, design, theatre, or similar, "
-                  "focus mainly on creative and arts paths (fine arts, design, animation, fashion, etc.). "
-                  "If she says engineering, ML, AI, data science, coding, or similar, "
-                  "focus mainly on tech paths. "
-                  "Include realistic Indian examples (e.g., entrance exams, common degrees, scholarship searches) "
-                  "and keep it budget-aware where needed."
-            )
-            text_lower = user_input.lower()
-
-            arts_words = [
-                "art", "arts", "craft", "crafts", "dance", "sing", "singing",
-                "design", "fashion", "music", "drama", "painting", "drawing"
-            ]
-            tech_words = [
-                "engineering", "engineer", "software", "coding", "programming",
-                "ml", "machine learning", "ai", "data science", "developer",
-                "scientist", "cs", "computer science"
-            ]
-            medical_words = [
-                "doctor", "mbbs", "dentist", "dental", "nurse", "nursing",
-                "pharmacy", "pharmacist", "physiotherapist", "medical"
-            ]
-            law_words = [
-                "law", "lawyer", "advocate", "llb", "judge", "legal", "clat"
-            ]
-            government_words = [
-                "government job", "govt job", "group 1", "group 2", "upsc",
-                "civil services", "ias", "ips", "ifs", "psc"
-            ]
-
-            if any(w in text_lower for w in arts_words):
-                enriched_question += (
-                    "\n\nShe is especially interested in arts or creative fields. "
-                    "Talk mainly about creative courses, diplomas, degrees and careers "
-                    "(fine arts, design, animation, fashion, music, theatre, etc.), "
-                    "not software engineering."
-                )
-            if any(w in text_lower for w in tech_words):
-                enriched_question += (
-                    "\n\nShe is especially interested in technology. "
-                    "Talk mainly about engineering, computer science, data, AI/ML, and related paths. "
-                    "Mention common entrance exams and budget-friendly options."
-                )
-            if any(w in text_lower for w in medical_words):
-                enriched_question += (
-                    "\n\nShe is especially interested in medical fields. "
-                    "Talk about MBBS, BDS, nursing, pharmacy, paramedical and related options, "
-                    "with entrance exams and realistic challenges."
-                )
-            if any(w in text_lower for w in law_words):
-                enriched_question += (
-                    "\n\nShe is especially interested in law. "
-                    "Explain paths like 5-year integrated law after 12th, 3-year LLB after degree, "
-                    "important exams (like CLAT), and common law careers."
-                )
-            if any(w in text_lower for w in government_words):
-                enriched_question += (
-                    "\n\nShe is especially interested in government jobs. "
-                    "Talk clearly about realistic paths (state PSC, UPSC, banking exams, SSC, etc.) "
-                    "and how to prepare over multiple years from her current stage."
-                )
+            # Start the structured roadmap first so it runs while the prompt is built.
+            roadmap_future = submit_dynamic_roadmap(profile, user_input, user=st.session_state.user_email)
 
-            # Call structured roadmap for extra context like college keywords and budget
-            roadmap_json = generate_dynamic_roadmap(profile, user_input)
-            colleges_text = ""
-            if roadmap_json:
-                colleges = get_matching_colleges(roadmap_json)
-                if colleges:
-                    lines = ["Some example colleges or training places you could search for:"]
-                    for c in colleges:
-                        lines.append(f"- {c['name']} ({c['course']}) – approx budget: {c['budget']}")
-                        lines.append(f"  Link: {c['link']}")
-                    colleges_text = "\n".join(lines)
+            intents = classify_intents(user_input)
 
-            kb_context = colleges_text
-
-            user_prompt = build_guidance_user_prompt(profile, enriched_question, kb_context)
+            # Use the structured roadmap for college context only if it is ready in time;
+            # otherwise it keeps running and the Visual Roadmap block picks it up later.
+            try:
+                roadmap_json = roadmap_future.result(timeout=ROADMAP_CONTEXT_DEADLINE)
+            except FutureTimeoutError:
+                roadmap_json = None
+            colleges = get_matching_colleges(roadmap_json) if roadmap_json else []
 
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ]
+            messages = build_guidance_messages(profile, user_input, colleges, intents)
 
-            with st.spinner("HerPath Mentor is thinking about your path..."):
-                answer = call_ai_model(messages)
+            st.markdown(f"**You:** {user_input}")
+            st.markdown("**HerPath Mentor:**")
+            answer, error = write_answer_stream(messages)
 
             # Save the conversation
             st.session_state.guidance_history = []
             st.session_state.guidance_history.append({"role": "user", "content": user_input})
-            st.session_state.guidance_history.append({"role": "assistant", "content": answer})
+            st.session_state.guidance_history.append({"role": "assistant", "content": answer, "error": error})
 
             # Also store the last question for roadmap visualization
             st.session_state.last_guidance_question = user_input
@@ -703,39 +640,39 @@ def render_home_page(women_kb, profile):
                 else:
                     st.markdown("**HerPath Mentor:**")
                     st.markdown(msg["content"])
+                    render_chat_error(msg)
 
             # Visual roadmap blocks
             last_q = st.session_state.get("last_guidance_question")
             if last_q:
                 st.markdown("### Visual Roadmap (blocks)")
-                with st.spinner("Drawing your roadmap..."):
-                    roadmap_json = generate_dynamic_roadmap(profile, last_q)
-                if roadmap_json and roadmap_json.get("next_stages"):
-                    stages = roadmap_json["next_stages"]
-
-                    st.markdown('<div class="roadmap-grid">', unsafe_allow_html=True)
-
-                    for i, stage in enumerate(stages, start=1):
-                        title = stage.get("title", f"Stage {i}")
-                        desc = stage.get("description", "")
-                        exams = stage.get("entrance_exams", [])
-
-                        exams_text = ""
-                        if exams:
-                            exams_text = "Entrance exams: " + ", ".join(exams)
-
-                        card_html = f"""
-                        <div class="roadmap-card">
-                          <div class="roadmap-badge">Stage {i}</div>
-                          <div class="roadmap-title">{title}</div>
-                          <div class="roadmap-desc">{desc}</div>
-                          <div class="roadmap-desc"><em>{exams_text}</em></div>
-                        </div>
-                        """
-                        st.markdown(card_html, unsafe_allow_html=True)
-
-                    st.markdown("</div>", unsafe_allow_html=True)
-                else:
+                # Stages appear one by one while the roadmap streams in; cached roadmaps show at once.
+                st.markdown('<div class="roadmap-grid">', unsafe_allow_html=True)
+
+                stage_count = 0
+                for i, stage in enumerate(stream_dynamic_roadmap(profile, last_q, user=st.session_state.user_email), start=1):
+                    stage_count = i
+                    title = stage.get("title", f"Stage {i}")
+                    desc = stage.get("description", "")
+                    exams = stage.get("entrance_exams", [])
+
+                    exams_text = ""
+                    if exams:
+                        exams_text = "Entrance exams: " + ", ".join(exams)
+
+                    card_html = f"""
+                    <div class="roadmap-card">
+                      <div class="roadmap-badge">Stage {i}</div>
+                      <div class="roadmap-title">{title}</div>
+                      <div class="roadmap-desc">{desc}</div>
+                      <div class="roadmap-desc"><em>{exams_text}</em></div>
+                    </div>
+                    """
+                    st.markdown(card_html, unsafe_allow_html=True)
+
+                st.markdown("</div>", unsafe_allow_html=True)
+
+                if not stage_count:
                     st.info(
                         "Roadmap blocks could not be created this time, but you can still follow the written guidance above."
                     )
@@ -781,6 +718,7 @@ def render_home_page(women_kb, profile):
                 st.markdown(f"**You:** {msg['content']}")
             else:
                 st.markdown(f"**HerPath SoulFriend:** {msg['content']}")
+                render_chat_error(msg)
 
         user_input_support = st.text_input(
             "Type your message",
@@ -797,43 +735,25 @@ def render_home_page(women_kb, profile):
 
         if clear_support:
             st.session_state.support_history = []
+            st.session_state.support_context.reset()
 
         if send_support and user_input_support.strip():
-            system_prompt = build_support_system_prompt()
-            profile_local = st.session_state.profile
+            messages = st.session_state.support_context.build_messages(
+                st.session_state.profile,
+                st.session_state.support_history,
+                user_input_support,
+            )
 
-            messages = [
-                {"role": "system", "content": system_prompt},
-            ]
+            st.markdown(f"**You:** {user_input_support}")
+            st.markdown("**HerPath SoulFriend:**")
+            # Support conversations are private: never written to or replayed from the response cache.
+            answer, error = write_answer_stream(messages, use_cache=False)
 
-            for msg in st.session_state.support_history:
-                if msg["role"] == "user":
-                    user_prompt_past = build_support_user_prompt(profile_local, msg["content"])
-                    messages.append({"role": "user", "content": user_prompt_past})
-                else:
-                    messages.append({"role": "assistant", "content": msg["content"]})
-
-            user_prompt_now = build_support_user_prompt(profile_local, user_input_support)
-            messages.append({"role": "user", "content": user_prompt_now})
-
-            with st.spinner("HerPath SoulFriend is listening with care..."):
-                answer = call_ai_model(messages)
-
-            lowered = user_input_support.lower()
-            if any(
-                phrase in lowered
-                for phrase in [
-                    "end my life",
-                    "kill myself",
-                    "suicide",
-                    "don't want to live",
-                    "hurt myself",
-                ]
-            ):
+            if mentions_self_harm(user_input_support):
                 answer = add_emergency_footer(answer)
 
             st.session_state.support_history.append({"role": "user", "content": user_input_support})
-            st.session_state.support_history.append({"role": "assistant", "content": answer})
+            st.session_state.support_history.append({"role": "assistant", "content": answer, "error": error})
 
             st.session_state.support_input_value = ""
             st.rerun()
@@ -856,6 +776,7 @@ def render_help_page():
             st.markdown(f"**You:** {msg['content']}")
         else:
             st.markdown(f"**HerPath App Help:** {msg['content']}")
+            render_chat_error(msg)
 
     help_msg = st.text_input(
         "Type a question about the app",
@@ -874,24 +795,19 @@ def render_help_page():
         st.session_state.mini_bot_history = []
 
     if send_mini and help_msg.strip():
-        system_prompt = (
-            "You are a helpful in-app support assistant for the *HerPath Mentor* Streamlit web app. "
-            "Only talk about features that exist in this app: Login, Profile & Resume, "
-            "Home tabs (Career Guidance, Opportunities, Emotional Support), and the app Help page. "
-            "Do NOT invent mobile app features like bottom navigation, community forums, events, or resource libraries. "
-            "Explain where the user should click (Home tab, Profile icon, Emotional Support tab, etc.) in simple, friendly language."
-        )
-        user_prompt = f"User question about the app: {help_msg}"
+        system_prompt = build_help_system_prompt()
+        user_prompt = build_help_user_prompt(help_msg)
 
         messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
         ]
-        with st.spinner("HerPath help is replying..."):
-            reply = call_ai_model(messages)
+        st.markdown(f"**You:** {help_msg}")
+        st.markdown("**HerPath App Help:**")
+        reply, error = write_answer_stream(messages)
 
         st.session_state.mini_bot_history.append({"role": "user", "content": help_msg})
-        st.session_state.mini_bot_history.append({"role": "assistant", "content": reply})
+        st.session_state.mini_bot_history.append({"role": "assistant", "content": reply, "error": error})
 
         st.session_state.help_input_value = ""
         st.rerun()
@@ -899,14 +815,22 @@ def render_help_page():
 
 def main():
     st.set_page_config(page_title="HerPath Mentor", page_icon="💜")
+    start_exporters_from_env()
     init_session()
+
+    page = st.session_state.current_page if st.session_state.logged_in else "Login"
+    with span("streamlit_rerun", page=page):
+        render_app()
+
+
+def render_app():
     set_background("independent_woman_bg.png")
 
     if not st.session_state.logged_in:
         show_login()
         return
 
-    women_kb = load_women_programs_kb()
+    women_kb = get_women_programs_index("women_programs_kb.json")
     profile = get_profile()
 
     render_top_nav()
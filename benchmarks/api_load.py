@@ -0,0 +1,113 @@
+"""
+Load test for api_server, without Streamlit's rerun overhead in the way.
+
+    python -m benchmarks.api_load --requests 200 --concurrency 20
+    python -m benchmarks.api_load --url http://127.0.0.1:8000 --requests 200
+
+Without --url the ASGI app runs in-process with FakeGroq behind it; with --url
+requests go to a running server over keep-alive connections.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from benchmarks.run_benchmarks import _percentile
+
+PROFILE = {"age": 17, "education_level": "12th / Inter", "interests": "coding, AI", "financial_constraint": "Low"}
+
+
+def _payloads(i: int) -> Dict[str, Dict[str, Any]]:
+    # A different question per request, so every roadmap/guidance call reaches the model.
+    return {
+        "/v1/roadmap": {"profile": PROFILE, "question": f"What should I do after 12th for AI? ({i})"},
+        "/v1/opportunities": {"interests": "engineering scholarship", "education_level": "12th"},
+        "/v1/guidance": {"profile": PROFILE, "question": f"Which degree for machine learning? ({i})"},
+        "/v1/support": {"profile": PROFILE, "message": f"I feel nervous about results ({i})"},
+    }
+
+
+async def _worker(client: httpx.AsyncClient, jobs, samples: Dict[str, List[float]], errors: Dict[str, int]):
+    for i, path in jobs:
+        started = time.perf_counter()
+        try:
+            response = await client.post(path, json=_payloads(i)[path])
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        elapsed = (time.perf_counter() - started) * 1000
+        if ok:
+            samples[path].append(elapsed)
+        else:
+            errors[path] = errors.get(path, 0) + 1
+
+
+async def run(url: str | None, requests: int, concurrency: int, latency: float) -> Dict[str, Any]:
+    if url:
+        transport, base_url = None, url
+    else:
+        import ai_client
+        import api_server
+        from benchmarks.fake_groq import FakeGroq
+
+        fake = FakeGroq(latency=latency)
+        ai_client.client = fake
+        ai_client.async_client = fake.as_async()
+        transport, base_url = httpx.ASGITransport(app=api_server.app), "http://api"
+
+    paths = list(_payloads(0))
+    jobs = iter((i, paths[i % len(paths)]) for i in range(requests))
+    samples: Dict[str, List[float]] = {p: [] for p in paths}
+    errors: Dict[str, int] = {}
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, limits=limits, timeout=120) as client:
+        started = time.perf_counter()
+        # Workers share one job iterator, so each request is taken exactly once.
+        await asyncio.gather(*[_worker(client, jobs, samples, errors) for _ in range(concurrency)])
+        wall = time.perf_counter() - started
+
+    done = sum(len(s) for s in samples.values())
+    return {
+        "config": {"url": url or "in-process", "requests": requests, "concurrency": concurrency, "latency_s": latency},
+        "throughput_rps": round(done / wall, 2) if wall else 0.0,
+        "wall_s": round(wall, 3),
+        "endpoints": {
+            path: {
+                "p50_ms": round(_percentile(s, 0.50), 2),
+                "p95_ms": round(_percentile(s, 0.95), 2),
+                "mean_ms": round(statistics.fmean(s), 2) if s else 0.0,
+                "ok": len(s),
+                "errors": errors.get(path, 0),
+            }
+            for path, s in samples.items()
+        },
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="HerPath API load test.")
+    parser.add_argument("--url", help="running api_server base URL (default: in-process with FakeGroq)")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.3, help="fake time to first token, seconds")
+    parser.add_argument("--output", default="bench_api_results.json")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args.url, args.requests, args.concurrency, args.latency))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"throughput: {results['throughput_rps']} req/s over {results['wall_s']} s")
+    for path, stats in results["endpoints"].items():
+        print(f"{path:20s} p50 {stats['p50_ms']:9.2f} ms  p95 {stats['p95_ms']:9.2f} ms  errors {stats['errors']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+FAKE_ROADMAP = {
+    "career_path": "B.Tech in CSE then ML engineer",
+    "current_stage": "12th",
+    "next_stages": [
+        {
+            "title": "Crack entrance exams",
+            "description": "Prepare for JEE Main and state CETs while finishing 12th.",
+            "entrance_exams": ["JEE Main", "TS EAMCET"],
+        },
+        {
+            "title": "B.Tech in CSE",
+            "description": "Study computer science at a government college to keep fees low.",
+            "entrance_exams": [],
+        },
+        {
+            "title": "Specialise in ML",
+            "description": "Build projects and apply for women-in-tech internships.",
+            "entrance_exams": [],
+        },
+    ],
+    "college_keywords": ["engineering"],
+    "budget_preference": "low",
+}
+
+FAKE_PROSE = (
+    "This year, start with the basics of programming using free online courses. "
+    "Over the next one to three years, aim for a budget-friendly engineering or science degree "
+    "and look for scholarships for girls on the National Scholarship Portal. "
+    "Later you can grow into roles like data analyst or machine learning engineer. "
+) * 3
+
+
+class FakeGroq:
+    """
+    Stand-in for groq.Groq with the same chat.completions.create surface.
+    Waits `latency` seconds before the first token, then emits text at
+    `tokens_per_second` (one word ~ one token). Counts every call.
+    """
+
+    def __init__(self, latency: float = 0.3, tokens_per_second: float = 400.0):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.calls = 0
+        self.calls_by_kind: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.calls = 0
+            self.calls_by_kind = {}
+
+    def _reply_for(self, messages: List[Dict[str, str]], response_format: Any) -> tuple[str, str]:
+        prompt = " ".join(m.get("content", "") for m in messages)
+        if response_format or "STRICT JSON" in prompt:
+            return "roadmap", json.dumps(FAKE_ROADMAP)
+        if "SoulFriend" in prompt:
+            return "support", "I hear you. It is okay to feel this way. " * 4
+        if "in-app support assistant" in prompt:
+            return "help", "Open the Home page and choose the Opportunities tab to see women-only schemes."
+        return "guidance", FAKE_PROSE
+
+    def _start(self, messages: List[Dict[str, str]], response_format: Any) -> tuple[List[str], Any]:
+        kind, text = self._reply_for(messages, response_format)
+        with self._lock:
+            self.calls += 1
+            self.calls_by_kind[kind] = self.calls_by_kind.get(kind, 0) + 1
+
+        words = text.split(" ")
+        prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+        usage = SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=len(words),
+            total_tokens=prompt_tokens + len(words),
+        )
+        return words, usage
+
+    @staticmethod
+    def _completion(words: List[str], usage: Any) -> Any:
+        message = SimpleNamespace(content=" ".join(words))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+    def _create(self, model=None, messages=None, stream=False, response_format=None, timeout=None, **kwargs):
+        words, usage = self._start(messages or [], response_format)
+        time.sleep(self.latency)
+
+        if not stream:
+            time.sleep(len(words) / self.tokens_per_second)
+            return self._completion(words, usage)
+
+        def chunks():
+            for i, word in enumerate(words):
+                time.sleep(1 / self.tokens_per_second)
+                delta = SimpleNamespace(content=word if i == 0 else " " + word)
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)], x_groq=None)
+            # Like Groq, usage arrives on a final chunk without choices.
+            yield SimpleNamespace(choices=[], x_groq=SimpleNamespace(usage=usage))
+
+        return chunks()
+
+    def as_async(self) -> "FakeAsyncGroq":
+        return FakeAsyncGroq(self)
+
+
+class FakeAsyncGroq:
+    """
+    groq.AsyncGroq stand-in for non-streaming calls; shares the call counters of a FakeGroq.
+    """
+
+    def __init__(self, sync: FakeGroq):
+        self.sync = sync
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, model=None, messages=None, response_format=None, timeout=None, **kwargs):
+        words, usage = self.sync._start(messages or [], response_format)
+        await asyncio.sleep(self.sync.latency + len(words) / self.sync.tokens_per_second)
+        return self.sync._completion(words, usage)
@@ -0,0 +1,204 @@
+"""
+Offline benchmark for the main user flows, driven headlessly through Streamlit's AppTest
+with ai_client.client and ai_client.async_client swapped for a local FakeGroq.
+
+    python -m benchmarks.run_benchmarks --iterations 20 --latency 0.3 --output bench_results.json
+    python -m benchmarks.run_benchmarks --compare bench_results.json
+
+Run from the repository root so the app finds its data files.
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from streamlit.testing.v1 import AppTest
+
+import ai_client
+import roadmap_engine
+from benchmarks.fake_groq import FakeGroq
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app.py")
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _click(at: AppTest, label: str) -> None:
+    for button in at.button:
+        if button.label == label:
+            button.click()
+            return
+    raise LookupError(f"No button labelled {label!r}")
+
+
+def _new_session(timeout: float) -> AppTest:
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    at.run()
+    at.session_state["logged_in"] = True
+    at.run()
+    return at
+
+
+def _guidance(at: AppTest, i: int) -> None:
+    at.text_input(key="guidance_input").input(f"I finished 12th and I like coding and AI, what next? (run {i})")
+    _click(at, "Ask HerPath Mentor")
+    at.run()
+
+
+def _roadmap_rerun(at: AppTest, i: int) -> None:
+    # A plain rerun redraws the Visual Roadmap block; it should not call the model again.
+    at.run()
+
+
+def _support(at: AppTest, i: int) -> None:
+    at.text_input(key="support_input").input(f"I feel stressed about exams and my family (run {i})")
+    _click(at, "Send to SoulFriend")
+    at.run()
+
+
+def _help(at: AppTest, i: int) -> None:
+    at.session_state["current_page"] = "Help"
+    at.run()
+    at.text_input(key="mini_bot_input").input(f"How do I see women-only schemes? (run {i})")
+    _click(at, "Send")
+    at.run()
+    at.session_state["current_page"] = "Home"
+
+
+FLOWS: Dict[str, Callable[[AppTest, int], None]] = {
+    "guidance": _guidance,
+    "roadmap_rerun": _roadmap_rerun,
+    "support": _support,
+    "help": _help,
+}
+
+
+def run(iterations: int, latency: float, tokens_per_second: float, timeout: float) -> Dict[str, Any]:
+    fake = FakeGroq(latency=latency, tokens_per_second=tokens_per_second)
+    ai_client.client = fake
+    ai_client.async_client = fake.as_async()
+    roadmap_engine.ROADMAP_CACHE.clear()
+    if ai_client.RESPONSE_CACHE is not None:
+        ai_client.RESPONSE_CACHE.clear()
+
+    timings: Dict[str, List[float]] = {name: [] for name in FLOWS}
+    calls: Dict[str, List[int]] = {name: [] for name in FLOWS}
+    session_kb: List[float] = []
+
+    # One discarded pass per flow, so imports, first script compile and lazy clients
+    # are not counted in the first sample.
+    at = _new_session(timeout)
+    for name, flow in FLOWS.items():
+        flow(at, -1)
+        if at.exception:
+            raise RuntimeError(f"{name} raised in the app during warmup: {at.exception}")
+    del at
+    fake.reset_counts()
+
+    tracemalloc.start()
+    for i in range(iterations):
+        gc.collect()
+        before, _ = tracemalloc.get_traced_memory()
+        at = _new_session(timeout)
+
+        for name, flow in FLOWS.items():
+            fake_calls = fake.calls
+            started = time.perf_counter()
+            flow(at, i)
+            timings[name].append((time.perf_counter() - started) * 1000)
+            calls[name].append(fake.calls - fake_calls)
+            if at.exception:
+                raise RuntimeError(f"{name} raised in the app: {at.exception}")
+
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+        session_kb.append((after - before) / 1024)
+        del at
+    tracemalloc.stop()
+
+    flows = {}
+    for name in FLOWS:
+        samples = timings[name]
+        flows[name] = {
+            "p50_ms": round(_percentile(samples, 0.50), 2),
+            "p95_ms": round(_percentile(samples, 0.95), 2),
+            "mean_ms": round(statistics.fmean(samples), 2),
+            "llm_calls_per_action": round(statistics.fmean(calls[name]), 2),
+            "samples": len(samples),
+        }
+
+    return {
+        "config": {
+            "iterations": iterations,
+            "warmup_iterations": 1,
+            "latency_s": latency,
+            "tokens_per_second": tokens_per_second,
+            "python": sys.version.split()[0],
+        },
+        "flows": flows,
+        "memory_per_session_kb": {
+            "mean": round(statistics.fmean(session_kb), 1),
+            "max": round(max(session_kb), 1),
+        },
+        "llm_calls_by_kind": dict(fake.calls_by_kind),
+    }
+
+
+def compare(current: Dict[str, Any], previous: Dict[str, Any]) -> List[str]:
+    lines = []
+    for name, now in current["flows"].items():
+        before = previous.get("flows", {}).get(name)
+        if not before:
+            continue
+        for metric in ("p50_ms", "p95_ms", "llm_calls_per_action"):
+            old, new = before[metric], now[metric]
+            change = ((new - old) / old * 100) if old else 0.0
+            lines.append(f"{name:15s} {metric:22s} {old:10.2f} -> {new:10.2f} ({change:+.1f}%)")
+    return lines
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline HerPath Mentor benchmark.")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.3, help="fake time to first token, seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=400.0)
+    parser.add_argument("--timeout", type=float, default=60.0, help="AppTest timeout per script run")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="earlier results JSON to diff against")
+    args = parser.parse_args(argv)
+
+    # Read the baseline before anything is written: --compare may name the --output file.
+    previous = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+
+    results = run(args.iterations, args.latency, args.tokens_per_second, args.timeout)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    for name, flow in results["flows"].items():
+        print(
+            f"{name:15s} p50 {flow['p50_ms']:9.2f} ms  p95 {flow['p95_ms']:9.2f} ms  "
+            f"LLM calls/action {flow['llm_calls_per_action']:.2f}"
+        )
+    print(f"memory per session: {results['memory_per_session_kb']['mean']} KB (mean)")
+
+    if previous is not None:
+        print("\n".join(compare(results, previous)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+import csv
+import heapq
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List
+
+from college_data import COLLEGES
+
+# Optional CSV/JSON dataset with name, course, budget, link and (optionally) location columns.
+COLLEGES_DATA_PATH = os.getenv("COLLEGES_DATA_PATH", "")
+
+
+# LLM keywords and everyday words -> course names used in the catalogue.
+COURSE_ALIASES: Dict[str, tuple[str, ...]] = {
+    "engineering": ("b.tech", "btech", "b.e", "be", "m.tech", "cse", "cs", "computer science",
+                    "computer", "it", "information technology", "ece", "eee", "electronics",
+                    "electrical", "mechanical", "civil", "software", "coding", "programming",
+                    "ai", "ml", "machine learning", "data science", "jee"),
+    "medical": ("mbbs", "md", "doctor", "medicine", "bds", "dental", "dentist", "nursing",
+                "b.sc nursing", "pharmacy", "b.pharm", "physiotherapy", "paramedical", "neet"),
+    "dance": ("bharatanatyam", "kathak", "kuchipudi", "odissi", "classical dance", "choreography"),
+    "performing arts": ("theatre", "theater", "drama", "acting", "music", "singing", "performing"),
+    "arts": ("fine arts", "ba", "b.a", "humanities", "painting", "drawing", "design"),
+    "law": ("llb", "ll.b", "lawyer", "advocate", "legal", "clat", "ballb", "ba llb"),
+}
+
+# Minimum trigram similarity for the fuzzy fallback.
+FUZZY_THRESHOLD = 0.5
+
+
+def _norm(value: Any) -> str:
+    return " ".join(str(value or "").lower().split())
+
+
+def _squash(value: str) -> str:
+    # "B.Tech", "b tech" and "btech" all become "btech"
+    return "".join(ch for ch in value if ch.isalnum())
+
+
+def _build_alias_table() -> Dict[str, tuple[str, ...]]:
+    table: Dict[str, list[str]] = {}
+    for course, aliases in COURSE_ALIASES.items():
+        for alias in aliases:
+            for form in {_norm(alias), _squash(_norm(alias))}:
+                targets = table.setdefault(form, [])
+                if course not in targets:
+                    targets.append(course)
+    return {alias: tuple(courses) for alias, courses in table.items()}
+
+
+ALIAS_TABLE = _build_alias_table()
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _similarity(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+@dataclass
+class CollegePage:
+    items: List[dict]
+    total: int
+    page: int
+    page_size: int
+
+    @property
+    def pages(self) -> int:
+        return (self.total + self.page_size - 1) // self.page_size if self.page_size else 1
+
+
+@dataclass
+class CollegeCatalogue:
+    """
+    Colleges with precomputed indexes on course, budget and location.
+
+    Keyword matching keeps the original rule (keyword is a substring of the course
+    name). Many colleges share a handful of course names, so a keyword is resolved
+    against the distinct course names once and then answered with set operations.
+    """
+
+    colleges: List[dict]
+    _by_course: Dict[str, set[int]] = field(default_factory=dict, init=False, repr=False)
+    _by_budget: Dict[str, set[int]] = field(default_factory=dict, init=False, repr=False)
+    _by_location: Dict[str, set[int]] = field(default_factory=dict, init=False, repr=False)
+    _keyword_cache: Dict[str, frozenset[int]] = field(default_factory=dict, init=False, repr=False)
+    # trigram -> course terms (whole course names and their single words) containing it
+    _trigram_index: Dict[str, set[str]] = field(default_factory=dict, init=False, repr=False)
+    # course term -> course names it came from
+    _term_courses: Dict[str, set[str]] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self):
+        for college_id, college in enumerate(self.colleges):
+            self._by_course.setdefault(_norm(college.get("course")), set()).add(college_id)
+            self._by_budget.setdefault(_norm(college.get("budget")), set()).add(college_id)
+            location = _norm(college.get("location"))
+            if location:
+                self._by_location.setdefault(location, set()).add(college_id)
+
+        for course in self._by_course:
+            for term in {course, *course.split()}:
+                self._term_courses.setdefault(term, set()).add(course)
+                for gram in _trigrams(term):
+                    self._trigram_index.setdefault(gram, set()).add(term)
+
+    def __len__(self) -> int:
+        return len(self.colleges)
+
+    @property
+    def course_names(self) -> List[str]:
+        return list(self._by_course)
+
+    def _exact_ids(self, keyword: str) -> set[int]:
+        matched: set[int] = set()
+        for course, course_ids in self._by_course.items():
+            if keyword in course:
+                matched |= course_ids
+        return matched
+
+    def _fuzzy_ids(self, keyword: str) -> set[int]:
+        grams = _trigrams(keyword)
+        candidates: set[str] = set()
+        for gram in grams:
+            candidates |= self._trigram_index.get(gram, set())
+
+        matched: set[int] = set()
+        for term in candidates:
+            if _similarity(grams, _trigrams(term)) >= FUZZY_THRESHOLD:
+                for course in self._term_courses[term]:
+                    matched |= self._by_course[course]
+        return matched
+
+    def ids_for_keyword(self, keyword: str) -> frozenset[int]:
+        """
+        Substring match on course names first; if that finds nothing, try the alias
+        table (e.g. "cse" -> engineering, "mbbs" -> medical) and then trigram similarity
+        for misspellings.
+        """
+        keyword = _norm(keyword)
+        ids = self._keyword_cache.get(keyword)
+        if ids is None:
+            matched = self._exact_ids(keyword)
+            if not matched:
+                for course in ALIAS_TABLE.get(keyword) or ALIAS_TABLE.get(_squash(keyword), ()):
+                    matched |= self._exact_ids(course)
+            if not matched and len(keyword) >= 3:
+                matched = self._fuzzy_ids(keyword)
+            ids = frozenset(matched)
+            if len(self._keyword_cache) >= 4096:
+                self._keyword_cache.clear()
+            self._keyword_cache[keyword] = ids
+        return ids
+
+    def ids_for_location(self, location: str) -> set[int]:
+        location = _norm(location)
+        matched: set[int] = set()
+        for name, ids in self._by_location.items():
+            if location in name:
+                matched |= ids
+        return matched
+
+    def search(
+        self,
+        keywords: Iterable[str] = (),
+        budget: str | None = None,
+        location: str | None = None,
+        page: int = 1,
+        page_size: int = 10,
+    ) -> CollegePage:
+        """
+        Colleges whose course matches any keyword, filtered by exact budget and
+        location substring. Ranked by how many keywords matched, then catalogue order.
+        """
+        keywords = [k for k in (_norm(k) for k in keywords) if k]
+        hits: Dict[int, int] = {}
+
+        if keywords:
+            for keyword in keywords:
+                for college_id in self.ids_for_keyword(keyword):
+                    hits[college_id] = hits.get(college_id, 0) + 1
+            candidates = set(hits)
+        else:
+            candidates = set(range(len(self.colleges)))
+
+        if budget:
+            candidates &= self._by_budget.get(_norm(budget), set())
+        if location:
+            candidates &= self.ids_for_location(location)
+
+        page = max(1, page)
+        start = (page - 1) * page_size
+        # Only the rows up to the requested page need ordering.
+        ranked = heapq.nsmallest(
+            start + page_size,
+            candidates,
+            key=lambda college_id: (-hits.get(college_id, 0), college_id),
+        )
+        items = [self.colleges[college_id] for college_id in ranked[start:]]
+        return CollegePage(items, len(candidates), page, page_size)
+
+
+def load_colleges(path: str) -> List[dict]:
+    """
+    Read colleges from a .json list or a .csv file with a header row.
+    """
+    if path.lower().endswith(".csv"):
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return [dict(row) for row in csv.DictReader(f)]
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+_CATALOGUE: CollegeCatalogue | None = None
+_CATALOGUE_LOCK = threading.Lock()
+
+
+def get_college_catalogue() -> CollegeCatalogue:
+    """
+    Process-wide catalogue, built on first use from COLLEGES_DATA_PATH or the built-in COLLEGES.
+    """
+    global _CATALOGUE
+    if _CATALOGUE is None:
+        with _CATALOGUE_LOCK:
+            if _CATALOGUE is None:
+                colleges = load_colleges(COLLEGES_DATA_PATH) if COLLEGES_DATA_PATH else COLLEGES
+                _CATALOGUE = CollegeCatalogue(list(colleges))
+    return _CATALOGUE
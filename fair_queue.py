@@ -0,0 +1,198 @@
+import asyncio
+import threading
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Dict, Iterator
+
+DEFAULT_USER = "anonymous"
+
+
+class SlotTimeout(Exception):
+    """
+    Raised when no slot became free within the caller's timeout.
+    """
+
+
+class _Waiter:
+    __slots__ = ("wake", "granted")
+
+    def __init__(self, wake: Callable[[], None]):
+        self.wake = wake
+        self.granted = False
+
+
+class FairLimiter:
+    """
+    Global concurrency limit with per-user fair queuing.
+
+    At most `limit` slots are held at once. When they are all taken, waiters queue
+    per user and freed slots are handed out round-robin across users, so one user
+    with many queued requests cannot starve the others. The limiter is thread-safe
+    and can be used from threads (slot) and from any event loop (slot_async) at the
+    same time.
+    """
+
+    def __init__(self, limit: int = 8):
+        self.limit = max(1, limit)
+        self._active = 0
+        # user -> waiters, in round-robin order (next user to serve first)
+        self._queues: "OrderedDict[str, deque[_Waiter]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.granted_immediately = 0
+        self.granted_after_wait = 0
+        self.timeouts = 0
+
+    def _enqueue(self, user: str, waiter: _Waiter) -> bool:
+        """
+        Take a free slot (True) or queue the waiter (False). Caller holds the lock.
+        """
+        if self._active < self.limit and not self._queues:
+            self._active += 1
+            self.granted_immediately += 1
+            return True
+        self._queues.setdefault(user, deque()).append(waiter)
+        return False
+
+    def _withdraw(self, user: str, waiter: _Waiter) -> bool:
+        """
+        Remove a waiter that gave up. Returns True if it had already been handed a
+        slot, which the caller then owns and must release. Caller holds the lock.
+        """
+        if waiter.granted:
+            return True
+        queue = self._queues.get(user)
+        if queue is not None:
+            try:
+                queue.remove(waiter)
+            except ValueError:
+                pass
+            if not queue:
+                del self._queues[user]
+        self.timeouts += 1
+        return False
+
+    def release(self) -> None:
+        with self._lock:
+            if not self._queues:
+                self._active -= 1
+                return
+            # Hand the slot straight to the next user in turn.
+            user, queue = next(iter(self._queues.items()))
+            waiter = queue.popleft()
+            if queue:
+                self._queues.move_to_end(user)
+            else:
+                del self._queues[user]
+            waiter.granted = True
+            self.granted_after_wait += 1
+        waiter.wake()
+
+    def acquire(self, user: str | None = None, timeout: float | None = None) -> None:
+        user = user or DEFAULT_USER
+        event = threading.Event()
+        waiter = _Waiter(event.set)
+        with self._lock:
+            if self._enqueue(user, waiter):
+                return
+        if event.wait(timeout):
+            return
+        with self._lock:
+            if self._withdraw(user, waiter):
+                return
+        raise SlotTimeout(f"no slot free within {timeout}s")
+
+    async def acquire_async(self, user: str | None = None, timeout: float | None = None) -> None:
+        user = user or DEFAULT_USER
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        waiter = _Waiter(wake)
+        with self._lock:
+            if self._enqueue(user, waiter):
+                return
+        try:
+            await asyncio.wait_for(future, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._lock:
+                owned = self._withdraw(user, waiter)
+            if isinstance(e, asyncio.CancelledError):
+                if owned:
+                    self.release()
+                raise
+            if not owned:
+                raise SlotTimeout(f"no slot free within {timeout}s") from e
+
+    @contextmanager
+    def slot(self, user: str | None = None, timeout: float | None = None) -> Iterator[None]:
+        self.acquire(user, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def slot_async(self, user: str | None = None, timeout: float | None = None):
+        await self.acquire_async(user, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "active": self._active,
+                "waiting": sum(len(q) for q in self._queues.values()),
+                "waiting_users": len(self._queues),
+                "granted_immediately": self.granted_immediately,
+                "granted_after_wait": self.granted_after_wait,
+                "timeouts": self.timeouts,
+            }
+
+
+class BackgroundLoop:
+    """
+    One asyncio event loop running in a daemon thread, so synchronous code (Streamlit
+    script threads, executor workers) can run coroutines without owning a loop.
+    """
+
+    def __init__(self, name: str = "ai-loop"):
+        self.name = name
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    self._thread = threading.Thread(target=loop.run_forever, name=self.name, daemon=True)
+                    self._thread.start()
+                    self._loop = loop
+        return self._loop
+
+    def in_loop(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def run(self, coro, timeout: float | None = None) -> Any:
+        """
+        Run coro on the background loop and block until it finishes.
+        """
+        if self.in_loop():
+            coro.close()
+            raise RuntimeError("BackgroundLoop.run() called from its own loop; await the coroutine instead")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    async def run_async(self, coro) -> Any:
+        """
+        Await coro on the background loop from any other event loop.
+        """
+        if self.in_loop():
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
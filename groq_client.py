@@ -0,0 +1,353 @@
+import asyncio
+import email.utils
+import random
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict
+
+import groq
+import httpx
+
+
+class AIErrorKind(str, Enum):
+    NOT_CONFIGURED = "not_configured"
+    RATE_LIMITED = "rate_limited"
+    TIMEOUT = "timeout"
+    CONNECTION = "connection"
+    UNAVAILABLE = "unavailable"
+    CIRCUIT_OPEN = "circuit_open"
+    AUTH = "auth"
+    BAD_REQUEST = "bad_request"
+    UNKNOWN = "unknown"
+
+
+# Friendly text shown in the chat when a request could not be answered.
+USER_MESSAGES = {
+    AIErrorKind.NOT_CONFIGURED: "Groq API key not configured. Please set GROQ_API_KEY in .env.",
+    AIErrorKind.RATE_LIMITED: "HerPath Mentor is answering a lot of questions right now. Please try again in a minute.",
+    AIErrorKind.TIMEOUT: "The AI service took too long to reply. Please try again.",
+    AIErrorKind.CONNECTION: "Could not reach the AI service. Please check your connection and try again.",
+    AIErrorKind.UNAVAILABLE: "The AI service is having trouble right now. Please try again shortly.",
+    AIErrorKind.CIRCUIT_OPEN: "The AI service is having trouble right now. Please try again shortly.",
+    AIErrorKind.AUTH: "The Groq API key was rejected. Please check GROQ_API_KEY in .env.",
+    AIErrorKind.BAD_REQUEST: "The AI service could not process this request.",
+    AIErrorKind.UNKNOWN: "Something went wrong while calling the AI service.",
+}
+
+RETRYABLE_KINDS = {
+    AIErrorKind.RATE_LIMITED,
+    AIErrorKind.TIMEOUT,
+    AIErrorKind.CONNECTION,
+    AIErrorKind.UNAVAILABLE,
+}
+
+
+@dataclass(frozen=True)
+class AIError:
+    kind: AIErrorKind
+    detail: str = ""
+    status_code: int | None = None
+    retry_after: float | None = None
+
+    @property
+    def retryable(self) -> bool:
+        return self.kind in RETRYABLE_KINDS
+
+    @property
+    def user_message(self) -> str:
+        return USER_MESSAGES[self.kind]
+
+
+@dataclass(frozen=True)
+class AIResult:
+    text: str | None = None
+    error: AIError | None = None
+    # Groq's token usage object for the call, when the response carried one.
+    usage: Any = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class AIRequestFailed(Exception):
+    """
+    Raised by the streaming helpers, which cannot return an AIResult.
+    """
+
+    def __init__(self, error: AIError):
+        super().__init__(error.detail or error.kind.value)
+        self.error = error
+
+
+def build_http_client(max_connections: int, max_keepalive: int, timeout: float) -> httpx.Client:
+    """
+    Shared connection pool for the Groq SDK.
+    """
+    return httpx.Client(
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive),
+        timeout=timeout,
+    )
+
+
+def build_async_http_client(max_connections: int, max_keepalive: int, timeout: float) -> httpx.AsyncClient:
+    """
+    Connection pool for AsyncGroq. httpx binds it to the first event loop that uses it.
+    """
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive),
+        timeout=timeout,
+    )
+
+
+def _parse_retry_after(headers: Any) -> float | None:
+    if not headers:
+        return None
+
+    retry_ms = headers.get("retry-after-ms")
+    if retry_ms:
+        try:
+            return float(retry_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        parsed = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        # Neither seconds nor an HTTP date; fall back to our own backoff.
+        return None
+    if parsed is None:
+        return None
+    return max(0.0, parsed.timestamp() - time.time())
+
+
+def classify_exception(exc: Exception) -> AIError:
+    detail = str(exc)
+
+    if isinstance(exc, groq.APITimeoutError):
+        return AIError(AIErrorKind.TIMEOUT, detail)
+    if isinstance(exc, groq.APIConnectionError):
+        return AIError(AIErrorKind.CONNECTION, detail)
+    if isinstance(exc, groq.APIStatusError):
+        status = exc.status_code
+        retry_after = _parse_retry_after(getattr(exc.response, "headers", None))
+        if status == 429:
+            return AIError(AIErrorKind.RATE_LIMITED, detail, status, retry_after)
+        if status in (408, 409) or status >= 500:
+            return AIError(AIErrorKind.UNAVAILABLE, detail, status, retry_after)
+        if status in (401, 403):
+            return AIError(AIErrorKind.AUTH, detail, status)
+        return AIError(AIErrorKind.BAD_REQUEST, detail, status)
+
+    return AIError(AIErrorKind.UNKNOWN, detail)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive retryable failures and rejects calls
+    for `reset_timeout` seconds. After that a single trial call is let through
+    (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._trial_running = False
+            if self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+
+    def delay_for(self, attempt: int, error: AIError) -> float:
+        """
+        Full-jitter exponential backoff; a server-provided Retry-After wins when it is longer.
+        """
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if error.retry_after is not None:
+            return max(error.retry_after, backoff)
+        return backoff
+
+
+def run_with_retries(
+    request: Callable[[float], Any],
+    policy: RetryPolicy,
+    breaker: CircuitBreaker,
+    attempt_timeout: float,
+    deadline: float,
+) -> Any:
+    """
+    Call request(timeout) until it succeeds, retrying retryable failures within
+    `deadline` seconds. Raises AIRequestFailed with a typed error otherwise.
+    """
+    give_up_at = time.monotonic() + deadline
+    attempt = 0
+
+    while True:
+        timeout = _attempt_timeout(breaker, attempt_timeout, give_up_at)
+        try:
+            response = request(timeout)
+        except Exception as e:
+            attempt += 1
+            time.sleep(_retry_delay(e, attempt, policy, breaker, give_up_at))
+            continue
+
+        breaker.record_success()
+        return response
+
+
+async def arun_with_retries(
+    request: Callable[[float], Awaitable[Any]],
+    policy: RetryPolicy,
+    breaker: CircuitBreaker,
+    attempt_timeout: float,
+    deadline: float,
+) -> Any:
+    """
+    Async run_with_retries: awaits request(timeout) and sleeps without blocking the loop.
+    """
+    give_up_at = time.monotonic() + deadline
+    attempt = 0
+
+    while True:
+        timeout = _attempt_timeout(breaker, attempt_timeout, give_up_at)
+        try:
+            response = await request(timeout)
+        except Exception as e:
+            attempt += 1
+            await asyncio.sleep(_retry_delay(e, attempt, policy, breaker, give_up_at))
+            continue
+
+        breaker.record_success()
+        return response
+
+
+def _attempt_timeout(breaker: CircuitBreaker, attempt_timeout: float, give_up_at: float) -> float:
+    # Deadline first: allow() may claim the half-open trial, which must then end in
+    # record_success or record_failure, never in an early return.
+    remaining = give_up_at - time.monotonic()
+    if remaining <= 0:
+        raise AIRequestFailed(AIError(AIErrorKind.TIMEOUT, "deadline exceeded"))
+
+    if not breaker.allow():
+        raise AIRequestFailed(AIError(AIErrorKind.CIRCUIT_OPEN, "circuit breaker is open"))
+    return min(attempt_timeout, remaining)
+
+
+def _retry_delay(
+    exc: Exception,
+    attempt: int,
+    policy: RetryPolicy,
+    breaker: CircuitBreaker,
+    give_up_at: float,
+) -> float:
+    """
+    How long to wait before the next attempt after `exc`, or raise AIRequestFailed
+    when the failure is not retryable or the attempts / deadline are used up.
+    """
+    error = classify_exception(exc)
+    if not error.retryable:
+        # The service answered; only the request was bad.
+        breaker.record_success()
+        raise AIRequestFailed(error) from exc
+
+    breaker.record_failure()
+    if attempt >= policy.max_attempts:
+        raise AIRequestFailed(error) from exc
+
+    delay = policy.delay_for(attempt - 1, error)
+    if time.monotonic() + delay >= give_up_at:
+        raise AIRequestFailed(error) from exc
+    return delay
+
+
+def create_completion(
+    client: Any,
+    kwargs: Dict[str, Any],
+    policy: RetryPolicy,
+    breaker: CircuitBreaker,
+    attempt_timeout: float,
+    deadline: float,
+) -> AIResult:
+    try:
+        completion = run_with_retries(
+            lambda timeout: client.chat.completions.create(timeout=timeout, **kwargs),
+            policy,
+            breaker,
+            attempt_timeout,
+            deadline,
+        )
+    except AIRequestFailed as e:
+        return AIResult(error=e.error)
+    return AIResult(text=completion.choices[0].message.content, usage=getattr(completion, "usage", None))
+
+
+async def acreate_completion(
+    client: Any,
+    kwargs: Dict[str, Any],
+    policy: RetryPolicy,
+    breaker: CircuitBreaker,
+    attempt_timeout: float,
+    deadline: float,
+) -> AIResult:
+    """
+    create_completion for an AsyncGroq client.
+    """
+    try:
+        completion = await arun_with_retries(
+            lambda timeout: client.chat.completions.create(timeout=timeout, **kwargs),
+            policy,
+            breaker,
+            attempt_timeout,
+            deadline,
+        )
+    except AIRequestFailed as e:
+        return AIResult(error=e.error)
+    return AIResult(text=completion.choices[0].message.content, usage=getattr(completion, "usage", None))
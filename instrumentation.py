@@ -0,0 +1,277 @@
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List
+
+# Port for the Prometheus text endpoint (off when unset) and path for periodic JSONL snapshots.
+METRICS_PORT = os.getenv("HERPATH_METRICS_PORT", "")
+METRICS_JSONL = os.getenv("HERPATH_METRICS_JSONL", "")
+METRICS_INTERVAL = float(os.getenv("HERPATH_METRICS_INTERVAL", "60"))
+
+# Upper bounds (seconds) of the latency histogram buckets.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    parts = []
+    for name, value in key:
+        value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _flatten(prefix: str, values: Dict[str, Any], out: Dict[str, float]) -> None:
+    for key, value in values.items():
+        name = f"{prefix}_{key}"
+        if isinstance(value, dict):
+            _flatten(name, value, out)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            out[name] = float(value)
+
+
+class _Histogram:
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def cumulative(self) -> List[int]:
+        out, running = [], 0
+        for c in self.counts:
+            running += c
+            out.append(running)
+        return out
+
+
+class MetricsRegistry:
+    """
+    In-process counters and latency histograms, plus gauge callbacks that are read
+    only when metrics are exported (cache stats, in-flight coalescing). Everything is
+    keyed by metric name and a sorted label tuple, and guarded by one lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._gauge_sources: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def inc(self, name: str, amount: float = 1, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram()
+            hist.observe(seconds)
+
+    def register_gauges(self, source: str, fn: Callable[[], Dict[str, Any]]) -> None:
+        """
+        fn returns a dict of numbers (nested dicts allowed), exported as herpath_<source>_<key> gauges.
+        """
+        with self._lock:
+            self._gauge_sources[source] = fn
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def _gauges(self) -> Dict[str, float]:
+        with self._lock:
+            sources = list(self._gauge_sources.items())
+        out: Dict[str, float] = {}
+        for source, fn in sources:
+            try:
+                values = fn() or {}
+            except Exception:
+                continue
+            _flatten(f"herpath_{source}", values, out)
+        return out
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(k), "value": v} for k, v in series.items()]
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: [
+                    {
+                        "labels": dict(k),
+                        "count": h.count,
+                        "sum": round(h.total, 6),
+                        "max": round(h.max, 6),
+                    }
+                    for k, h in series.items()
+                ]
+                for name, series in self._histograms.items()
+            }
+        return {
+            "ts": time.time(),
+            "counters": counters,
+            "histograms": histograms,
+            "gauges": self._gauges(),
+        }
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, hist in series.items():
+                    for bound, count in zip(LATENCY_BUCKETS, hist.cumulative()):
+                        bucket_key = key + (("le", f"{bound:g}"),)
+                        lines.append(f"{name}_bucket{_format_labels(bucket_key)} {count}")
+                    lines.append(f"{name}_bucket{_format_labels(key + (('le', '+Inf'),))} {hist.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {hist.total:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist.count}")
+        for name, value in sorted(self._gauges().items()):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+
+@contextmanager
+def span(name: str, **labels: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Time a block as herpath_<name>_seconds and count herpath_<name>_errors_total when it raises.
+    The yielded dict can be used to add labels (e.g. outcome) before the block ends.
+    """
+    extra: Dict[str, Any] = {}
+    started = time.perf_counter()
+    try:
+        yield extra
+    except Exception:
+        METRICS.inc(f"herpath_{name}_errors_total", **labels)
+        raise
+    finally:
+        METRICS.observe(f"herpath_{name}_seconds", time.perf_counter() - started, **labels, **extra)
+
+
+def timed(name: str, **labels: Any):
+    """
+    Decorator form of span().
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name, **labels):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def record_usage(usage: Any, model: str, operation: str) -> None:
+    """
+    Count prompt/completion tokens from a Groq `usage` object (or dict); ignores None.
+    """
+    if usage is None:
+        return
+    for field in ("prompt_tokens", "completion_tokens"):
+        value = usage.get(field) if isinstance(usage, dict) else getattr(usage, field, None)
+        if isinstance(value, (int, float)):
+            METRICS.inc("herpath_llm_tokens_total", value, model=model, operation=operation, type=field[:-7])
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = METRICS.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="herpath-metrics", daemon=True).start()
+    return server
+
+
+def start_jsonl_dump(path: str, interval: float = METRICS_INTERVAL) -> threading.Thread:
+    """
+    Append a METRICS.snapshot() line to path every interval seconds.
+    """
+
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(METRICS.snapshot()) + "\n")
+            except OSError:
+                pass
+
+    thread = threading.Thread(target=loop, name="herpath-metrics-jsonl", daemon=True)
+    thread.start()
+    return thread
+
+
+_EXPORTERS_STARTED = False
+_EXPORTERS_LOCK = threading.Lock()
+
+
+def start_exporters_from_env() -> None:
+    """
+    Start the HTTP endpoint and/or JSONL dump configured by HERPATH_METRICS_PORT and
+    HERPATH_METRICS_JSONL. Safe to call on every Streamlit rerun; only the first call acts.
+    """
+    global _EXPORTERS_STARTED
+    with _EXPORTERS_LOCK:
+        if _EXPORTERS_STARTED:
+            return
+        _EXPORTERS_STARTED = True
+        if METRICS_PORT:
+            try:
+                start_metrics_server(int(METRICS_PORT))
+            except OSError:
+                # Another process (e.g. a second Streamlit worker) already owns the port.
+                pass
+        if METRICS_JSONL:
+            start_jsonl_dump(METRICS_JSONL)
@@ -0,0 +1,79 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, List
+
+# Label -> words/phrases that signal it. Matched on word boundaries, with an optional
+# plural "s", so "ai" no longer fires on "said" or "art" on "start". Word-boundary
+# matching also means derived forms ("singer", "artist") must be listed explicitly;
+# they are the ones the old substring scan picked up through their stems.
+INTENT_VOCABULARY: Dict[str, tuple[str, ...]] = {
+    "arts": (
+        "art", "arts", "artist", "artistic", "craft", "crafts", "crafting",
+        "dance", "dancer", "dancing", "sing", "singer", "singing",
+        "design", "designer", "designing", "fashion", "music", "musician", "musical",
+        "drama", "painting", "painter", "drawing",
+    ),
+    "tech": (
+        "engineering", "engineer", "software", "coding", "coder", "programming", "programmer",
+        "ml", "machine learning", "ai", "data science", "developer",
+        "scientist", "cs", "computer science",
+    ),
+    "medical": (
+        "doctor", "mbbs", "dentist", "dental", "nurse", "nursing",
+        "pharmacy", "pharmacist", "physiotherapist", "medical",
+    ),
+    "law": (
+        "law", "lawyer", "advocate", "llb", "judge", "legal", "clat",
+    ),
+    "government": (
+        "government job", "govt job", "group 1", "group 2", "upsc",
+        "civil services", "ias", "ips", "ifs", "psc",
+    ),
+}
+
+
+@dataclass(frozen=True)
+class Intent:
+    label: str
+    weight: float
+    matches: tuple[str, ...]
+
+
+def _phrase_key(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _compile(vocabulary: Dict[str, tuple[str, ...]]) -> tuple[re.Pattern, Dict[str, set[str]]]:
+    labels_by_phrase: Dict[str, set[str]] = {}
+    for label, phrases in vocabulary.items():
+        for phrase in phrases:
+            labels_by_phrase.setdefault(_phrase_key(phrase), set()).add(label)
+
+    # Longest first so "machine learning" wins over shorter overlapping entries.
+    alternatives = sorted(labels_by_phrase, key=len, reverse=True)
+    body = "|".join(r"\s+".join(re.escape(part) for part in phrase.split()) for phrase in alternatives)
+    pattern = re.compile(rf"\b({body})(s?)\b", re.IGNORECASE)
+    return pattern, labels_by_phrase
+
+
+_PATTERN, _LABELS_BY_PHRASE = _compile(INTENT_VOCABULARY)
+
+
+def classify_intents(text: str) -> List[Intent]:
+    """
+    Scan `text` once and return every matched label, weighted by its share of
+    the matches, strongest first.
+    """
+    hits: Dict[str, list[str]] = {}
+    for match in _PATTERN.finditer(text or ""):
+        phrase = _phrase_key(match.group(1))
+        for label in _LABELS_BY_PHRASE.get(phrase, ()):
+            hits.setdefault(label, []).append(phrase)
+
+    total = sum(len(found) for found in hits.values())
+    intents = [
+        Intent(label, len(found) / total, tuple(dict.fromkeys(found)))
+        for label, found in hits.items()
+    ]
+    intents.sort(key=lambda intent: intent.weight, reverse=True)
+    return intents
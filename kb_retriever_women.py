@@ -1,7 +1,23 @@
+import hashlib
+import heapq
 import json
+import logging
+import math
 import os
+import re
+import threading
+from types import MappingProxyType
 from typing import List, Dict, Any
 
+from instrumentation import timed
+
+# "substring" keeps the original word-count scoring; "bm25" is the opt-in ranked mode.
+DEFAULT_RANKING = os.getenv("KB_RANKING", "substring")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+logger = logging.getLogger(__name__)
+
 
 def load_women_programs_kb(path: str = "women_programs_kb.json") -> List[Dict[str, Any]]:
     if not os.path.exists(path):
@@ -10,12 +26,292 @@ def load_women_programs_kb(path: str = "women_programs_kb.json") -> List[Dict[st
         return json.load(f)
 
 
+def _searchable_text(item: Dict[str, Any]) -> str:
+    return (
+        item.get("summary", "")
+        + " "
+        + item.get("focus", "")
+        + " "
+        + item.get("good_for", "")
+    ).lower()
+
+
+def _tokenize(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def kb_fingerprint(kb: List[Dict[str, Any]]) -> str:
+    # default=dict lets read-only MappingProxyType items from the shared store through
+    payload = json.dumps(kb, sort_keys=True, ensure_ascii=False, default=dict)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BM25Model:
+    """
+    BM25 statistics over summary/focus/good_for. Per-document length norms,
+    the IDF table and term frequencies are computed once and can be saved next
+    to the KB file, so later processes only reload them.
+    """
+
+    def __init__(
+        self,
+        fingerprint: str,
+        idf: Dict[str, float],
+        norms: list[float],
+        term_freqs: list[Dict[str, int]],
+        k1: float = 1.5,
+    ):
+        self.fingerprint = fingerprint
+        self.idf = idf
+        self.norms = norms
+        self.k1 = k1
+        # term -> [(doc_id, tf)], so a query only touches documents containing its terms
+        self.postings: Dict[str, list[tuple[int, int]]] = {}
+        for doc_id, freqs in enumerate(term_freqs):
+            for term, tf in freqs.items():
+                self.postings.setdefault(term, []).append((doc_id, tf))
+        self._term_freqs = term_freqs
+
+    @classmethod
+    def build(cls, kb: List[Dict[str, Any]], k1: float = 1.5, b: float = 0.75) -> "BM25Model":
+        term_freqs: list[Dict[str, int]] = []
+        doc_freq: Dict[str, int] = {}
+        lengths: list[int] = []
+
+        for item in kb:
+            tokens = _tokenize(_searchable_text(item))
+            freqs: Dict[str, int] = {}
+            for token in tokens:
+                freqs[token] = freqs.get(token, 0) + 1
+            for token in freqs:
+                doc_freq[token] = doc_freq.get(token, 0) + 1
+            term_freqs.append(freqs)
+            lengths.append(len(tokens))
+
+        n_docs = len(kb)
+        avg_len = (sum(lengths) / n_docs) if n_docs else 0.0
+        idf = {
+            term: math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            for term, df in doc_freq.items()
+        }
+        norms = [
+            k1 * (1 - b + b * (length / avg_len)) if avg_len else k1
+            for length in lengths
+        ]
+        return cls(kb_fingerprint(kb), idf, norms, term_freqs, k1)
+
+    @classmethod
+    def load_or_build(cls, kb: List[Dict[str, Any]], path: str | None) -> "BM25Model":
+        """
+        Reload saved statistics when they were computed for this exact KB,
+        otherwise rebuild them and save the result to `path`.
+        """
+        fingerprint = kb_fingerprint(kb)
+        if path and os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("fingerprint") == fingerprint:
+                    return cls(fingerprint, data["idf"], data["norms"], data["term_freqs"], data["k1"])
+            except (OSError, ValueError, KeyError):
+                pass
+
+        model = cls.build(kb)
+        if path:
+            model.save(path)
+        return model
+
+    def save(self, path: str) -> None:
+        data = {
+            "fingerprint": self.fingerprint,
+            "k1": self.k1,
+            "idf": self.idf,
+            "norms": self.norms,
+            "term_freqs": self._term_freqs,
+        }
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+        except OSError:
+            # Read-only deployments just rebuild the tables on startup.
+            pass
+
+    def scores(self, query: str) -> Dict[int, float]:
+        scores: Dict[int, float] = {}
+        for term in set(_tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_id, tf in self.postings[term]:
+                weight = idf * tf * (self.k1 + 1) / (tf + self.norms[doc_id])
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight
+        return scores
+
+
+def _bm25_rank_key(pair: tuple[float, int]) -> tuple[float, int]:
+    return pair[0], -pair[1]
+
+
+class WomenProgramsIndex:
+    """
+    Pre-tokenized view of the KB for filter_women_programs.
+
+    Scoring stays the same as the linear scan: every interest word that appears
+    anywhere in summary/focus/good_for (as a substring) adds one point. A word
+    without spaces can only occur inside a single whitespace-separated token, so
+    the index maps tokens to item ids and a query word is resolved by checking the
+    (much smaller) token vocabulary instead of every item's text.
+    """
+
+    def __init__(self, kb: List[Dict[str, Any]], bm25_path: str | None = None):
+        self.items = list(kb)
+        self.bm25_path = bm25_path
+        self._bm25: BM25Model | None = None
+        self._texts: list[str] = []
+        self._postings: Dict[str, set[int]] = {}
+        self._by_category: Dict[str | None, list[int]] = {}
+        self._word_cache: Dict[str, frozenset[int]] = {}
+
+        for doc_id, item in enumerate(self.items):
+            text = _searchable_text(item)
+            self._texts.append(text)
+            for token in set(text.split()):
+                self._postings.setdefault(token, set()).add(doc_id)
+            self._by_category.setdefault(item.get("category"), []).append(doc_id)
+
+    @classmethod
+    def from_file(cls, path: str = "women_programs_kb.json") -> "WomenProgramsIndex":
+        """
+        Load the KB and keep its BM25 tables in a sidecar file next to it.
+        """
+        return cls(load_women_programs_kb(path), bm25_path=os.path.splitext(path)[0] + ".bm25.json")
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @property
+    def bm25(self) -> BM25Model:
+        if self._bm25 is None:
+            self._bm25 = BM25Model.load_or_build(self.items, self.bm25_path)
+        return self._bm25
+
+    def _docs_containing(self, word: str) -> frozenset[int]:
+        docs = self._word_cache.get(word)
+        if docs is None:
+            matched: set[int] = set()
+            for token, ids in self._postings.items():
+                if word in token:
+                    matched |= ids
+            docs = frozenset(matched)
+            if len(self._word_cache) >= 4096:
+                self._word_cache.clear()
+            self._word_cache[word] = docs
+        return docs
+
+    def _candidate_ids(self, category: str | None) -> list[int]:
+        if category:
+            return self._by_category.get(category, [])
+        return list(range(len(self.items)))
+
+    def search(
+        self,
+        interests: str = "",
+        education_level: str = "",
+        category: str | None = None,
+        ranking: str | None = None,
+        top_k: int | None = None,
+    ) -> List[Dict[str, Any]]:
+        ranking = ranking or DEFAULT_RANKING
+        if ranking == "bm25":
+            return self._search_bm25(interests, education_level, category, top_k)
+        if ranking != "substring":
+            raise ValueError(f"Unknown ranking mode: {ranking}")
+
+        results = self._search_substring(interests, education_level, category)
+        return results[:top_k] if top_k is not None else results
+
+    def _search_bm25(
+        self,
+        interests: str,
+        education_level: str,
+        category: str | None,
+        top_k: int | None,
+    ) -> List[Dict[str, Any]]:
+        candidates = self._candidate_ids(category)
+        scores = self.bm25.scores(f"{interests or ''} {education_level or ''}")
+
+        allowed = set(candidates) if category else None
+        scored = [
+            (score, doc_id)
+            for doc_id, score in scores.items()
+            if allowed is None or doc_id in allowed
+        ]
+
+        if not scored:
+            # same fallback as the substring mode: never leave a category empty
+            fallback = candidates if category else []
+            return [self.items[doc_id] for doc_id in fallback[:top_k]]
+
+        # Ties keep KB order (lower doc_id first).
+        if top_k is not None:
+            best = heapq.nlargest(top_k, scored, key=_bm25_rank_key)
+        else:
+            best = sorted(scored, key=_bm25_rank_key, reverse=True)
+        return [self.items[doc_id] for _, doc_id in best]
+
+    def _search_substring(
+        self,
+        interests: str,
+        education_level: str,
+        category: str | None,
+    ) -> List[Dict[str, Any]]:
+        interests_lower = (interests or "").lower()
+        edu_lower = (education_level or "").lower()
+        candidates = self._candidate_ids(category)
+
+        scores: Dict[int, int] = {}
+        for word in interests_lower.split():
+            for doc_id in self._docs_containing(word):
+                scores[doc_id] = scores.get(doc_id, 0) + 1
+
+        if edu_lower:
+            if edu_lower.split() == [edu_lower]:
+                edu_docs = self._docs_containing(edu_lower)
+                for doc_id in candidates:
+                    if doc_id in edu_docs:
+                        scores[doc_id] = scores.get(doc_id, 0) + 1
+            else:
+                # Phrases like "12th / inter" can span tokens, so check the stored text.
+                for doc_id in candidates:
+                    if edu_lower in self._texts[doc_id]:
+                        scores[doc_id] = scores.get(doc_id, 0) + 1
+
+        results = [(scores[doc_id], doc_id) for doc_id in candidates if scores.get(doc_id, 0) > 0]
+
+        # fallback to show all items in that category even if interests don't match
+        if not results and category:
+            results = [(0, doc_id) for doc_id in candidates]
+
+        # Stable sort on score only, so ties keep KB order like the linear scan.
+        results.sort(key=lambda x: x[0], reverse=True)
+        return [self.items[doc_id] for _, doc_id in results]
+
+
+@timed("women_programs_filter")
 def filter_women_programs(
-    kb: List[Dict[str, Any]],
+    kb: List[Dict[str, Any]] | WomenProgramsIndex,
     interests: str = "",
     education_level: str = "",
     category: str | None = None,
+    ranking: str | None = None,
+    top_k: int | None = None,
 ) -> List[Dict[str, Any]]:
+    ranking = ranking or DEFAULT_RANKING
+    if isinstance(kb, WomenProgramsIndex):
+        return kb.search(interests, education_level, category, ranking, top_k)
+    if ranking != "substring":
+        return WomenProgramsIndex(kb).search(interests, education_level, category, ranking, top_k)
+
     interests_lower = (interests or "").lower()
     edu_lower = (education_level or "").lower()
 
@@ -25,13 +321,7 @@ def filter_women_programs(
         if category and item.get("category") != category:
             continue
 
-        text = (
-            item.get("summary", "")
-            + " "
-            + item.get("focus", "")
-            + " "
-            + item.get("good_for", "")
-        ).lower()
+        text = _searchable_text(item)
 
         score = 0
         for word in interests_lower.split():
@@ -51,7 +341,87 @@ def filter_women_programs(
                 results.append((0, item))
 
     results.sort(key=lambda x: x[0], reverse=True)
-    return [r[1] for r in results]
+    matched = [r[1] for r in results]
+    return matched[:top_k] if top_k is not None else matched
+
+
+class WomenProgramsStore:
+    """
+    Process-wide holder for one KB file. The JSON is parsed once and every session
+    gets the same WomenProgramsIndex over read-only items. The file is only re-read
+    when its mtime/size change, and only re-parsed when its content hash changes.
+    """
+
+    def __init__(self, path: str = "women_programs_kb.json"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stat_signature: tuple[int, int] | None = None
+        self._digest: str | None = None
+        # Stat signature of a file that failed to load, so it is not retried on every get().
+        self._failed_signature: tuple[int, int] | None = None
+        self._index = WomenProgramsIndex([])
+        self.reloads = 0
+        self.load_errors = 0
+
+    def get(self) -> WomenProgramsIndex:
+        try:
+            st = os.stat(self.path)
+            signature = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            signature = None
+
+        if signature == self._stat_signature or (signature is not None and signature == self._failed_signature):
+            return self._index
+
+        with self._lock:
+            if signature != self._stat_signature and signature != self._failed_signature:
+                self._refresh(signature)
+            return self._index
+
+    def _refresh(self, signature: tuple[int, int] | None) -> None:
+        if signature is None:
+            self._index = WomenProgramsIndex([])
+            self._digest = None
+            self._stat_signature = None
+            return
+
+        try:
+            with open(self.path, "rb") as f:
+                raw = f.read()
+            digest = hashlib.sha256(raw).hexdigest()
+            parsed = json.loads(raw.decode("utf-8")) if digest != self._digest else None
+        except (OSError, ValueError) as e:
+            # A half-written or broken file: keep serving the previous snapshot.
+            logger.warning("could not reload %s, keeping the previous snapshot: %s", self.path, e)
+            self._failed_signature = signature
+            self.load_errors += 1
+            return
+
+        self._failed_signature = None
+        if parsed is not None:
+            items = [MappingProxyType(item) for item in parsed]
+            bm25_path = os.path.splitext(self.path)[0] + ".bm25.json"
+            self._index = WomenProgramsIndex(tuple(items), bm25_path=bm25_path)
+            self._digest = digest
+            self.reloads += 1
+
+        self._stat_signature = signature
+
+
+_STORES: Dict[str, WomenProgramsStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_women_programs_index(path: str = "women_programs_kb.json") -> WomenProgramsIndex:
+    """
+    Shared index for `path`, reloaded automatically when the file changes.
+    """
+    key = os.path.abspath(path)
+    store = _STORES.get(key)
+    if store is None:
+        with _STORES_LOCK:
+            store = _STORES.setdefault(key, WomenProgramsStore(path))
+    return store.get()
 
 
 def format_women_programs_for_display(programs: List[Dict[str, Any]]) -> str:
@@ -1,87 +1,176 @@
-def build_guidance_system_prompt():
-    return (
-        "You are HerPath Mentor, a calm, friendly career guide for girls and young women. "
-        "Each message is independent: IGNORE any earlier conversations and do not mention what she said in the past. "
-        "You must give a clear, detailed, paragraph-style roadmap (not bullet points) for the user's path. "
-        "Write in simple English, like an older sister from India who understands budget limits and family pressure. "
-        "Always adapt strongly to what she actually asks now (arts, dance, singing, engineering, ML, data science, doctor, lawyer, etc.). "
-        "Include realistic options after 10th, 12th, and degree where relevant, and mention budget-friendly paths and scholarship ideas if needed. "
-        "Do not repeat the same generic examples for every user."
-    )
+import string
+import threading
+from typing import Any, Dict
+
+from instrumentation import METRICS
+from token_estimate import estimate_tokens
 
 
-def build_guidance_user_prompt(profile, user_question, kb_context: str = ""):
+class PromptTemplate:
     """
-    kb_context can include links or snippets from a knowledge base for scholarships / colleges.
+    A prompt parsed once at import into literal segments and {field} slots.
+
+    Everything before the first slot is the static prefix: it is the same bytes on
+    every request, which is what provider-side prompt caching matches on, so the
+    templates below keep fixed instructions ahead of profile/question fields.
     """
-    return f"""
-Profile:
-- Age: {profile.get("age")}
-- Current education level: {profile.get("education_level")}
-- Interests: {profile.get("interests")}
-- Location: {profile.get("location")}
-- Financial situation: {profile.get("financial_constraint")}
-- Goals: {profile.get("goals")}
 
+    def __init__(self, name: str, text: str):
+        self.name = name
+        self._segments = [
+            (literal, field_name)
+            for literal, field_name, _, _ in string.Formatter().parse(text)
+        ]
+        self.fields = tuple(f for _, f in self._segments if f is not None)
+
+        prefix_parts = []
+        for literal, field_name in self._segments:
+            prefix_parts.append(literal)
+            if field_name is not None:
+                break
+        self.static_prefix = "".join(prefix_parts)
+        self.static_tokens = estimate_tokens(self.static_prefix)
+
+        # Fully static prompts are rendered once and returned as the same string.
+        self._static_text = self.static_prefix if not self.fields else None
+
+        self.renders = 0
+        self.rendered_tokens = 0
+        self._lock = threading.Lock()
+
+    def render(self, **values: Any) -> str:
+        if self._static_text is not None:
+            text = self._static_text
+        else:
+            parts = []
+            for literal, field_name in self._segments:
+                parts.append(literal)
+                if field_name is not None:
+                    parts.append(str(values[field_name]))
+            text = "".join(parts)
+
+        tokens = self.static_tokens if self._static_text is not None else estimate_tokens(text)
+        with self._lock:
+            self.renders += 1
+            self.rendered_tokens += tokens
+        return text
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "static_prefix_tokens": self.static_tokens,
+                "fields": list(self.fields),
+                "renders": self.renders,
+                "avg_rendered_tokens": round(self.rendered_tokens / self.renders, 1) if self.renders else 0.0,
+            }
+
+
+PROMPT_REGISTRY: Dict[str, PromptTemplate] = {}
+
+
+def register_prompt(name: str, text: str) -> PromptTemplate:
+    template = PromptTemplate(name, text)
+    PROMPT_REGISTRY[name] = template
+    return template
+
+
+def prompt_token_report() -> Dict[str, Dict[str, Any]]:
+    """
+    Per-template static-prefix size and average rendered size, in estimated tokens.
+    """
+    return {name: template.stats() for name, template in PROMPT_REGISTRY.items()}
+
+
+METRICS.register_gauges("prompts", prompt_token_report)
+
+
+_PROFILE_FIELDS_FOR_PROMPTS = (
+    "age",
+    "education_level",
+    "interests",
+    "location",
+    "financial_constraint",
+    "goals",
+)
+
+
+def _profile_values(profile) -> Dict[str, Any]:
+    return {field: profile.get(field) for field in _PROFILE_FIELDS_FOR_PROMPTS}
+
+
+GUIDANCE_SYSTEM = register_prompt(
+    "guidance_system",
+    "You are HerPath Mentor, a calm, friendly career guide for girls and young women. "
+    "Each message is independent: IGNORE any earlier conversations and do not mention what she said in the past. "
+    "You must give a clear, detailed, paragraph-style roadmap (not bullet points) for the user's path. "
+    "Write in simple English, like an older sister from India who understands budget limits and family pressure. "
+    "Always adapt strongly to what she actually asks now (arts, dance, singing, engineering, ML, data science, doctor, lawyer, etc.). "
+    "Include realistic options after 10th, 12th, and degree where relevant, and mention budget-friendly paths and scholarship ideas if needed. "
+    "Do not repeat the same generic examples for every user.",
+)
+
+GUIDANCE_USER = register_prompt(
+    "guidance_user",
+    """
 You must give a detailed roadmap in paragraphs, not bullet points, covering:
 - Near term (this year): what she can start learning/doing from today.
 - 1–3 year path: courses, degrees, or training, with exam or application suggestions.
 - Long term: possible roles and directions she can grow into.
 - Mention budget-friendly or government options, and searches she can do online for scholarships.
 
+Profile:
+- Age: {age}
+- Current education level: {education_level}
+- Interests: {interests}
+- Location: {location}
+- Financial situation: {financial_constraint}
+- Goals: {goals}
+
 User question:
-\"\"\"{user_question}\"\"\"
+\"\"\"{user_question}{intent_hints}\"\"\"
 
 Useful background / knowledge base (you can use if relevant):
 \"\"\"{kb_context}\"\"\"
-"""
-
-
-def build_support_system_prompt():
-    return (
-        "You are SoulFriend, a gentle emotional support companion for girls and young women. "
-        "You listen with empathy, validate feelings, and reply in short, warm paragraphs. "
-        "You never judge. You never give medical diagnoses. "
-        "If the user mentions self-harm, suicide, or immediate danger, you must gently encourage them to contact local emergency services or a trusted adult."
-    )
+""",
+)
 
+SUPPORT_SYSTEM_BASE = (
+    "You are SoulFriend, a gentle emotional support companion for girls and young women. "
+    "You listen with empathy, validate feelings, and reply in short, warm paragraphs. "
+    "You never judge. You never give medical diagnoses. "
+    "If the user mentions self-harm, suicide, or immediate danger, you must gently encourage them to contact local emergency services or a trusted adult."
+)
 
-def build_support_user_prompt(profile, message):
-    return f"""
-User profile (for context):
-- Age: {profile.get("age")}
-- Education level: {profile.get("education_level")}
-- Location: {profile.get("location")}
-- Goals: {profile.get("goals")}
+SUPPORT_REPLY_STYLE = (
+    "Reply in a caring, conversational tone, 2–4 short paragraphs. Encourage her strengths, "
+    "suggest small next steps, and gently remind her she deserves safety and respect."
+)
 
-User message:
-\"\"\"{message}\"\"\"
+SUPPORT_SYSTEM = register_prompt("support_system", SUPPORT_SYSTEM_BASE)
 
-Reply in a caring, conversational tone, 2–4 short paragraphs. Encourage her strengths, suggest small next steps, and gently remind her she deserves safety and respect.
-"""
+SUPPORT_SYSTEM_WITH_PROFILE = register_prompt(
+    "support_system_with_profile",
+    SUPPORT_SYSTEM_BASE
+    + "\n\n"
+    + SUPPORT_REPLY_STYLE
+    + """
 
+User profile (for context):
+- Age: {age}
+- Education level: {education_level}
+- Location: {location}
+- Goals: {goals}
+""",
+)
 
-def build_dynamic_roadmap_prompt(profile, user_input):
-    """
-    Prompt for structured JSON roadmap used by the college matching engine.
+ROADMAP_USER = register_prompt(
+    "roadmap_user",
     """
-    return f"""
 You are an AI career architect for girls and young women in India.
 
 Generate a structured career roadmap in STRICT JSON format.
 Return ONLY valid JSON. No explanation. No markdown.
 
-Profile:
-- Age: {profile.get("age")}
-- Education: {profile.get("education_level")}
-- Interests: {profile.get("interests")}
-- Location: {profile.get("location")}
-- Financial constraint: {profile.get("financial_constraint")}
-- Goals: {profile.get("goals")}
-
-User message:
-\"\"\"{user_input}\"\"\"
-
 Output JSON format:
 
 {{
@@ -97,4 +186,161 @@ Output JSON format:
   "college_keywords": ["engineering", "arts", "medical", "dance", "law"],
   "budget_preference": "low"  // or "medium" or "high"
 }}
-"""
+
+Build it for this profile and message.
+
+Profile:
+- Age: {age}
+- Education: {education_level}
+- Interests: {interests}
+- Location: {location}
+- Financial constraint: {financial_constraint}
+- Goals: {goals}
+
+User message:
+\"\"\"{user_input}\"\"\"
+
+Detected interest areas (weighted): {focus}
+""",
+)
+
+
+HELP_SYSTEM = register_prompt(
+    "help_system",
+    "You are a helpful in-app support assistant for the *HerPath Mentor* Streamlit web app. "
+    "Only talk about features that exist in this app: Login, Profile & Resume, "
+    "Home tabs (Career Guidance, Opportunities, Emotional Support), and the app Help page. "
+    "Do NOT invent mobile app features like bottom navigation, community forums, events, or resource libraries. "
+    "Explain where the user should click (Home tab, Profile icon, Emotional Support tab, etc.) in simple, friendly language.",
+)
+
+HELP_USER = register_prompt("help_user", "User question about the app: {message}")
+
+
+def build_guidance_system_prompt():
+    return GUIDANCE_SYSTEM.render()
+
+
+# Extra instructions for each label from intent.classify_intents, in the order they are added.
+INTENT_HINTS = {
+    "arts": (
+        "She is especially interested in arts or creative fields. "
+        "Talk mainly about creative courses, diplomas, degrees and careers "
+        "(fine arts, design, animation, fashion, music, theatre, etc.), "
+        "not software engineering."
+    ),
+    "tech": (
+        "She is especially interested in technology. "
+        "Talk mainly about engineering, computer science, data, AI/ML, and related paths. "
+        "Mention common entrance exams and budget-friendly options."
+    ),
+    "medical": (
+        "She is especially interested in medical fields. "
+        "Talk about MBBS, BDS, nursing, pharmacy, paramedical and related options, "
+        "with entrance exams and realistic challenges."
+    ),
+    "law": (
+        "She is especially interested in law. "
+        "Explain paths like 5-year integrated law after 12th, 3-year LLB after degree, "
+        "important exams (like CLAT), and common law careers."
+    ),
+    "government": (
+        "She is especially interested in government jobs. "
+        "Talk clearly about realistic paths (state PSC, UPSC, banking exams, SSC, etc.) "
+        "and how to prepare over multiple years from her current stage."
+    ),
+}
+
+
+def format_intent_hints(intents) -> str:
+    """
+    intents: list of intent.Intent. Returns the matching INTENT_HINTS paragraphs.
+    """
+    labels = {intent.label for intent in intents or []}
+    return "".join(f"\n\n{hint}" for label, hint in INTENT_HINTS.items() if label in labels)
+
+
+def format_intent_focus(intents) -> str:
+    """
+    One line like "tech (67%), arts (33%)" for the structured roadmap prompt.
+    """
+    return ", ".join(f"{intent.label} ({intent.weight:.0%})" for intent in intents or [])
+
+
+def build_guidance_user_prompt(profile, user_question, kb_context: str = "", intents=None):
+    """
+    kb_context can include links or snippets from a knowledge base for scholarships / colleges.
+    intents (from intent.classify_intents) add focus instructions after the question.
+    """
+    return GUIDANCE_USER.render(
+        **_profile_values(profile),
+        user_question=user_question,
+        intent_hints=format_intent_hints(intents),
+        kb_context=kb_context,
+    )
+
+
+# Follows the raw question in every guidance request.
+GUIDANCE_QUESTION_SUFFIX = (
+    "\n\nYou must give a fresh roadmap each time in paragraph form, not bullet points. "
+    "Adapt strongly to what she typed now. "
+    "If she mentions arts, dance, singing, crafts, design, theatre, or similar, "
+    "focus mainly on creative and arts paths (fine arts, design, animation, fashion, etc.). "
+    "If she says engineering, ML, AI, data science, coding, or similar, "
+    "focus mainly on tech paths. "
+    "Include realistic Indian examples (e.g., entrance exams, common degrees, scholarship searches) "
+    "and keep it budget-aware where needed."
+)
+
+
+def format_colleges_context(colleges) -> str:
+    if not colleges:
+        return ""
+    lines = ["Some example colleges or training places you could search for:"]
+    for c in colleges:
+        lines.append(f"- {c['name']} ({c['course']}) – approx budget: {c['budget']}")
+        lines.append(f"  Link: {c['link']}")
+    return "\n".join(lines)
+
+
+def build_guidance_messages(profile, user_input, colleges=None, intents=None):
+    """
+    System + user messages for one guidance answer. colleges (from the structured
+    roadmap) become the knowledge-base context.
+    """
+    enriched_question = "User question: " + user_input + GUIDANCE_QUESTION_SUFFIX
+    return [
+        {"role": "system", "content": build_guidance_system_prompt()},
+        {
+            "role": "user",
+            "content": build_guidance_user_prompt(
+                profile, enriched_question, format_colleges_context(colleges), intents
+            ),
+        },
+    ]
+
+
+def build_support_system_prompt(profile=None):
+    """
+    With a profile, the profile block and reply style are stated once here, so the
+    user turns can be sent as plain messages.
+    """
+    if profile is None:
+        return SUPPORT_SYSTEM.render()
+    return SUPPORT_SYSTEM_WITH_PROFILE.render(**_profile_values(profile))
+
+
+def build_dynamic_roadmap_prompt(profile, user_input, intents=None):
+    """
+    Prompt for structured JSON roadmap used by the college matching engine.
+    """
+    focus = format_intent_focus(intents) or "not clear, infer from the message"
+    return ROADMAP_USER.render(**_profile_values(profile), user_input=user_input, focus=focus)
+
+
+def build_help_system_prompt():
+    return HELP_SYSTEM.render()
+
+
+def build_help_user_prompt(message):
+    return HELP_USER.render(message=message)
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List
+
+from ttl_cache import TTLCache
+
+
+def make_cache_key(model: str, messages: List[Dict[str, Any]], response_format: str | None) -> str:
+    """
+    Hash of everything that changes the completion we would get back.
+    """
+    payload = json.dumps(
+        {"model": model, "messages": messages, "response_format": response_format},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SQLiteResponseStore:
+    """
+    Persistent tier. Keeps at most `max_entries` rows and drops the least recently
+    used ones first; rows older than `ttl` seconds are treated as missing.
+    """
+
+    def __init__(self, path: str, max_entries: int = 5000, ttl: float = 7 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] + self.ttl < now:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._conn.execute(
+                """
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            total = self.hits + self.misses
+            return {
+                "size": size,
+                "maxsize": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / total) if total else 0.0,
+            }
+
+
+class ResponseCache:
+    """
+    Two-tier cache for model responses: an in-process LRU in front of an optional
+    persistent store. Disk hits are promoted into memory.
+    """
+
+    def __init__(self, memory: TTLCache, disk: SQLiteResponseStore | None = None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key: str) -> str | None:
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+
+        if self.disk is None:
+            return None
+
+        value = self.disk.get(key)
+        if value is not None:
+            self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory": self.memory.stats(),
+            "disk": self.disk.stats() if self.disk is not None else None,
+        }
+
+
+def build_response_cache_from_env() -> ResponseCache | None:
+    """
+    The cache is opt-in: set AI_CACHE_ENABLED=1. AI_CACHE_PATH enables the SQLite tier
+    (set it to an empty string for memory only).
+    """
+    if os.getenv("AI_CACHE_ENABLED", "0").lower() not in ("1", "true", "yes"):
+        return None
+
+    memory = TTLCache(
+        maxsize=int(os.getenv("AI_CACHE_MEMORY_SIZE", "512")),
+        ttl=float(os.getenv("AI_CACHE_MEMORY_TTL", "3600")),
+    )
+
+    disk = None
+    path = os.getenv("AI_CACHE_PATH", ".cache/ai_responses.sqlite3")
+    if path:
+        disk = SQLiteResponseStore(
+            path,
+            max_entries=int(os.getenv("AI_CACHE_DISK_SIZE", "5000")),
+            ttl=float(os.getenv("AI_CACHE_DISK_TTL", str(7 * 24 * 3600))),
+        )
+
+    return ResponseCache(memory, disk)
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+from io import BytesIO
+from typing import Any, Dict
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from instrumentation import METRICS, timed
+from text_layout import TextWrapper
+from ttl_cache import TTLCache
+
+# Fields of the profile dict created in app.init_session.
+PROFILE_FIELDS = (
+    "name",
+    "age",
+    "education_level",
+    "interests",
+    "location",
+    "financial_constraint",
+    "goals",
+    "college",
+    "degree",
+    "branch",
+    "cgpa",
+    "experience_summary",
+    "projects_summary",
+    "skills_summary",
+    "certifications_summary",
+    "extra_summary",
+)
+
+# Choices of the profile form's select boxes ("" = not set yet).
+EDUCATION_LEVELS = ("", "10th", "12th / Inter", "Degree", "Working")
+FINANCIAL_OPTIONS = ("", "Need low-budget options", "Moderate", "Can afford higher fees")
+
+
+def empty_profile() -> Dict[str, Any]:
+    profile: Dict[str, Any] = {field: "" for field in PROFILE_FIELDS}
+    profile["age"] = 0
+    return profile
+
+
+# Content-addressed: the same profile, email and photo always map to the same PDF bytes.
+RESUME_PDF_CACHE = TTLCache(
+    maxsize=int(os.getenv("RESUME_CACHE_SIZE", "64")),
+    ttl=float(os.getenv("RESUME_CACHE_TTL", "86400")),
+)
+METRICS.register_gauges("resume_pdf_cache", RESUME_PDF_CACHE.stats)
+
+
+def resume_cache_key(
+    profile: Dict[str, Any],
+    email: str = "",
+    photo: bytes | None = None,
+    justify: bool = False,
+) -> str:
+    """
+    Hash of everything that ends up in the PDF.
+    """
+    digest = hashlib.sha256(b"justify" if justify else b"left")
+    digest.update(json.dumps(profile, sort_keys=True, default=str).encode("utf-8"))
+    digest.update(b"\0" + (email or "").encode("utf-8") + b"\0")
+    if photo:
+        digest.update(hashlib.sha256(photo).digest())
+    return digest.hexdigest()
+
+
+def get_resume_pdf(
+    profile: Dict[str, Any],
+    email: str = "",
+    photo: bytes | None = None,
+    justify: bool = False,
+) -> bytes:
+    """
+    Cached build_resume_pdf.
+    """
+    key = resume_cache_key(profile, email, photo, justify)
+    pdf_bytes = RESUME_PDF_CACHE.get(key)
+    if pdf_bytes is None:
+        pdf_bytes = build_resume_pdf(profile, email, photo, justify)
+        RESUME_PDF_CACHE.set(key, pdf_bytes)
+    return pdf_bytes
+
+
+@timed("resume_pdf_build")
+def build_resume_pdf(
+    profile: Dict[str, Any],
+    email: str = "",
+    photo: bytes | None = None,
+    justify: bool = False,
+) -> bytes:
+    """
+    Render the resume PDF for a profile dict (same fields as init_session's profile).
+    justify stretches body lines to the full text width.
+    """
+    p = profile
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+
+    # Start text a bit lower to avoid header collisions
+    y = height - 70
+
+    # Optional photo on the top-right
+    photo_size = 80
+    if photo:
+        try:
+            img = ImageReader(BytesIO(photo))
+            c.drawImage(
+                img,
+                width - photo_size - 40,   # x
+                height - photo_size - 40,  # y
+                width=photo_size,
+                height=photo_size,
+                preserveAspectRatio=True,
+                mask="auto",
+            )
+        except Exception:
+            # Ignore image errors
+            pass
+
+    x = 40  # text always from left
+
+    c.setFont("Helvetica-Bold", 16)
+    c.drawString(x, y, p.get("name", ""))
+    y -= 25
+    c.setFont("Helvetica", 11)
+    c.drawString(x, y, f"Email: {email}")
+    y -= 15
+    c.drawString(x, y, f"Location: {p.get('location','')}")
+    y -= 30
+
+    def section(title):
+        nonlocal y
+        if y < 80:
+            c.showPage()
+            y = height - 70
+        c.setFont("Helvetica-Bold", 13)
+        c.drawString(x, y, title)
+        y -= 18
+        c.setFont("Helvetica", 11)
+
+    body_text = TextWrapper("Helvetica", 11, justify=justify, hyphenate=True)
+
+    def write_paragraph(text):
+        nonlocal y
+        max_width = width - 2 * x
+        for line in text.split("\n"):
+            for chunk in body_text.layout(line, max_width):
+                if y < 60:
+                    c.showPage()
+                    y = height - 70
+                    c.setFont("Helvetica", 11)
+                body_text.draw_line(c, x, y, chunk)
+                y -= 14
+        y -= 8
+
+    section("Education")
+    edu = f"{p.get('college','')} — {p.get('degree','')} in {p.get('branch','')} | CGPA: {p.get('cgpa','')}"
+    write_paragraph(edu)
+
+    section("Experience")
+    write_paragraph(p.get("experience_summary", ""))
+
+    section("Projects")
+    write_paragraph(p.get("projects_summary", ""))
+
+    section("Technical Skills")
+    write_paragraph(p.get("skills_summary", ""))
+
+    section("Certifications & Achievements")
+    write_paragraph(p.get("certifications_summary", ""))
+
+    section("Additional")
+    extra_text = (
+        f"Financial situation: {p.get('financial_constraint','')}. "
+        f"Goals: {p.get('goals','')}. "
+        f"Extra: {p.get('extra_summary','')}."
+    )
+    write_paragraph(extra_text)
+
+    c.save()
+    buffer.seek(0)
+    return buffer.getvalue()
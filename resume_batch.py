@@ -0,0 +1,209 @@
+"""
+Batch resume export.
+
+    python resume_batch.py profiles.jsonl --out-dir resumes/
+    python resume_batch.py profiles.jsonl --zip resumes.zip --workers 8
+    python resume_batch.py profiles.jsonl --zip - > resumes.zip
+
+Each JSONL line is a profile dict with the same fields as init_session's profile,
+plus optional "email", "photo_path" and "file_name".
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List
+
+from resume import PROFILE_FIELDS, build_resume_pdf, empty_profile
+from resume_service import normalize_photo
+
+_UNSAFE_NAME_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def _file_name(record: Dict[str, Any], line_no: int) -> str:
+    name = record.get("file_name") or record.get("name") or "resume"
+    name = _UNSAFE_NAME_RE.sub("_", str(name)).strip("._") or "resume"
+    if not name.lower().endswith(".pdf"):
+        name = f"{line_no:05d}_{name}.pdf"
+    return name
+
+
+def _unique_name(name: str, line_no: int, used: set[str]) -> str:
+    """
+    name, or name with the line number before ".pdf" when an earlier record already
+    took it (explicit file_name values are not prefixed, so they can collide).
+    """
+    if name in used:
+        stem, ext = os.path.splitext(name)
+        name = f"{stem}_{line_no:05d}{ext}"
+    used.add(name)
+    return name
+
+
+def render_record(line_no: int, record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Render one JSONL record. Runs in a worker process; returns the PDF bytes and timing.
+    """
+    started = time.perf_counter()
+    profile = empty_profile()
+    profile.update({k: record[k] for k in PROFILE_FIELDS if k in record})
+
+    photo = None
+    photo_path = record.get("photo_path")
+    if photo_path:
+        with open(photo_path, "rb") as f:
+            photo = normalize_photo(f.read())
+
+    pdf = build_resume_pdf(profile, record.get("email", ""), photo)
+    return {
+        "line": line_no,
+        "file_name": _file_name(record, line_no),
+        "pdf": pdf,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def _render_record_safely(line_no: int, record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    render_record that reports a failure in its result instead of raising, so one bad
+    record does not abort the rest of the batch.
+    """
+    try:
+        return render_record(line_no, record)
+    except Exception as e:
+        return {"line": line_no, "error": f"{type(e).__name__}: {e}"}
+
+
+def read_profiles(path: str) -> Iterator[tuple[int, Dict[str, Any]] | Dict[str, Any]]:
+    """
+    Yield (line_no, record) per JSONL line. A line that is not a JSON object yields
+    a {"line", "error"} failure instead, so it is reported without stopping the batch.
+    """
+    stream = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        for line_no, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield {"line": line_no, "error": f"invalid JSON: {e}"}
+                continue
+            if not isinstance(record, dict):
+                yield {"line": line_no, "error": f"expected a JSON object, got {type(record).__name__}"}
+                continue
+            yield line_no, record
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def render_resumes(
+    records: Iterable[tuple[int, Dict[str, Any]] | Dict[str, Any]],
+    workers: int | None = None,
+    chunksize: int = 4,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Render records across `workers` processes, yielding results in input order.
+    Records that fail yield {"line", "error"} instead of a PDF; failures already
+    reported by read_profiles are passed through in their place.
+    """
+    records = list(records)
+    valid = [item for item in records if isinstance(item, tuple)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        rendered = pool.map(
+            _render_record_safely,
+            [line_no for line_no, _ in valid],
+            [record for _, record in valid],
+            chunksize=chunksize,
+        )
+        for item in records:
+            yield next(rendered) if isinstance(item, tuple) else item
+
+
+def _summary(timings: List[float], wall: float) -> Dict[str, Any]:
+    ordered = sorted(timings)
+    count = len(ordered)
+
+    def pct(q: float) -> float:
+        return ordered[min(count - 1, int(q * count))] if count else 0.0
+
+    return {
+        "documents": count,
+        "wall_seconds": round(wall, 3),
+        "docs_per_second": round(count / wall, 2) if wall else 0.0,
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2) if count else 0.0,
+        "p50_ms": round(pct(0.50) * 1000, 2),
+        "p95_ms": round(pct(0.95) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2) if count else 0.0,
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Render resume PDFs for many profiles.")
+    parser.add_argument("profiles", help="JSONL file with one profile per line ('-' for stdin)")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--out-dir", help="write one PDF per profile into this directory")
+    target.add_argument("--zip", help="write all PDFs into this zip file ('-' streams it to stdout)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--report", help="also write per-document timings and totals to this JSON file")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    per_document: List[Dict[str, Any]] = []
+    failures: List[Dict[str, Any]] = []
+    used_names: set[str] = set()
+
+    archive = None
+    out = None
+    if args.zip:
+        out = sys.stdout.buffer if args.zip == "-" else open(args.zip, "wb")
+        archive = zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED)
+    else:
+        os.makedirs(args.out_dir, exist_ok=True)
+
+    try:
+        for result in render_resumes(read_profiles(args.profiles), args.workers):
+            if "error" in result:
+                failures.append(result)
+                print(f"line {result['line']}: {result['error']}", file=sys.stderr)
+                continue
+            result["file_name"] = _unique_name(result["file_name"], result["line"], used_names)
+            if archive is not None:
+                archive.writestr(result["file_name"], result["pdf"])
+            else:
+                with open(os.path.join(args.out_dir, result["file_name"]), "wb") as f:
+                    f.write(result["pdf"])
+            per_document.append(
+                {"line": result["line"], "file_name": result["file_name"], "ms": round(result["seconds"] * 1000, 2)}
+            )
+    finally:
+        if archive is not None:
+            archive.close()
+        if out is not None and out is not sys.stdout.buffer:
+            out.close()
+
+    summary = _summary([d["ms"] / 1000 for d in per_document], time.perf_counter() - started)
+    # Report on stderr so a zip streamed to stdout stays intact.
+    print(
+        f"Rendered {summary['documents']} resumes in {summary['wall_seconds']}s "
+        f"({summary['docs_per_second']} docs/s, p50 {summary['p50_ms']} ms, p95 {summary['p95_ms']} ms), "
+        f"{len(failures)} failed",
+        file=sys.stderr,
+    )
+
+    if args.report:
+        summary["failed"] = len(failures)
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "documents": per_document, "failures": failures}, f, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
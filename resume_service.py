@@ -0,0 +1,165 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Any, Callable, Dict
+
+from instrumentation import METRICS
+from resume import RESUME_PDF_CACHE, build_resume_pdf, resume_cache_key
+
+# Longest side of the stored profile photo; the PDF draws it at 80pt, so this is plenty.
+PHOTO_MAX_SIZE = int(os.getenv("RESUME_PHOTO_MAX_SIZE", "320"))
+
+
+def normalize_photo(data: bytes, max_size: int = PHOTO_MAX_SIZE) -> bytes:
+    """
+    Downscale and re-encode an uploaded photo as a small RGB JPEG, honouring the
+    EXIF orientation that phone cameras set. Returns the input unchanged if it
+    cannot be decoded.
+    """
+    try:
+        from PIL import Image, ImageOps
+
+        img = Image.open(BytesIO(data))
+        img = ImageOps.exif_transpose(img)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        img.thumbnail((max_size, max_size))
+
+        out = BytesIO()
+        img.save(out, format="JPEG", quality=85, optimize=True)
+        return out.getvalue()
+    except Exception:
+        return data
+
+
+class ResumeRenderService:
+    """
+    Renders resume PDFs in a process pool so Streamlit's script thread never does
+    the heavy work. Calls return Futures the UI can poll; identical PDF requests
+    share a Future, and finished PDFs land in RESUME_PDF_CACHE. (Photos are small
+    enough to run through normalize_photo inline.)
+    """
+
+    def __init__(self, max_workers: int | None = None, mp_context: str = "spawn"):
+        self.max_workers = max_workers
+        # "spawn" avoids forking a process that already runs Streamlit's threads.
+        self.mp_context = mp_context
+        self._executor: ProcessPoolExecutor | None = None
+        self._inflight: Dict[str, Future] = {}
+        # Reentrant: pool callbacks that take it can run synchronously inside submit/shutdown.
+        self._lock = threading.RLock()
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(self.mp_context),
+            )
+        return self._executor
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """
+        Run fn in the pool. If the pool is broken (a worker died), it is replaced and
+        the call is retried once on the new pool.
+        """
+        outer: Future = Future()
+        self._run(outer, fn, args, retries=1)
+        return outer
+
+    def _run(self, outer: Future, fn: Callable[..., Any], args: tuple, retries: int) -> None:
+        with self._lock:
+            pool = self._pool()
+            try:
+                inner = pool.submit(fn, *args)
+            except BrokenProcessPool as e:
+                inner, error = None, e
+        if inner is None:
+            self._retry_or_fail(outer, pool, fn, args, retries, error)
+            return
+        inner.add_done_callback(lambda f: self._settle(outer, pool, fn, args, retries, f))
+
+    def _settle(
+        self, outer: Future, pool: ProcessPoolExecutor, fn: Callable[..., Any], args: tuple, retries: int, inner: Future
+    ) -> None:
+        if outer.done():
+            return
+        if inner.cancelled():
+            outer.cancel()
+            return
+        error = inner.exception()
+        if isinstance(error, BrokenProcessPool):
+            self._retry_or_fail(outer, pool, fn, args, retries, error)
+        elif error is not None:
+            outer.set_exception(error)
+        else:
+            outer.set_result(inner.result())
+
+    def _retry_or_fail(
+        self,
+        outer: Future,
+        pool: ProcessPoolExecutor,
+        fn: Callable[..., Any],
+        args: tuple,
+        retries: int,
+        error: BaseException,
+    ) -> None:
+        with self._lock:
+            # Only the first caller to notice replaces the pool; others reuse the new one.
+            if self._executor is pool:
+                self._executor = None
+                METRICS.inc("herpath_resume_pool_restarts_total")
+        pool.shutdown(wait=False, cancel_futures=True)
+        if retries > 0:
+            self._run(outer, fn, args, retries - 1)
+        else:
+            outer.set_exception(error)
+
+    def submit_pdf(
+        self,
+        profile: Dict[str, Any],
+        email: str = "",
+        photo: bytes | None = None,
+        justify: bool = False,
+    ) -> Future:
+        key = resume_cache_key(profile, email, photo, justify)
+        cached = RESUME_PDF_CACHE.get(key)
+        if cached is not None:
+            done: Future = Future()
+            done.set_result(cached)
+            return done
+
+        with self._lock:
+            pending = self._inflight.get(key)
+            if pending is not None:
+                return pending
+            future = self._submit(build_resume_pdf, dict(profile), email, photo, justify)
+            self._inflight[key] = future
+
+        started = time.perf_counter()
+        future.add_done_callback(lambda f: self._finish(key, f, started))
+        return future
+
+    def _finish(self, key: str, future: Future, started: float) -> None:
+        # build_resume_pdf's own timing stays in the worker process; this is the
+        # wall time the UI waited, queueing included.
+        METRICS.observe("herpath_resume_pdf_render_seconds", time.perf_counter() - started)
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        if not future.cancelled() and future.exception() is None:
+            RESUME_PDF_CACHE.set(key, future.result())
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+RENDER_SERVICE = ResumeRenderService(
+    max_workers=int(os.getenv("RESUME_WORKERS", "2")),
+)
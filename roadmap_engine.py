@@ -1,58 +1,242 @@
+import hashlib
 import json
-from typing import Any, Dict, List
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List
 
-from college_data import COLLEGES
-from ai_client import call_ai_model
+from college_catalogue import get_college_catalogue
+from ai_client import call_ai_model_result, stream_ai_model
+from groq_client import AIError
+from instrumentation import METRICS, timed
+from intent import classify_intents
 from prompts import build_dynamic_roadmap_prompt
+from roadmap_schema import IncrementalRoadmapParser, parse_roadmap
+from roadmap_warmup import lookup_warm_roadmap
+from ttl_cache import TTLCache
 
+# Only the fields that go into build_dynamic_roadmap_prompt affect the roadmap.
+ROADMAP_PROFILE_FIELDS = (
+    "age",
+    "education_level",
+    "interests",
+    "location",
+    "financial_constraint",
+    "goals",
+)
 
-def generate_dynamic_roadmap(profile: Dict[str, Any], user_input: str) -> Dict[str, Any] | None:
+# Shared by the send path and the Visual Roadmap block, across all sessions.
+ROADMAP_CACHE = TTLCache(
+    maxsize=int(os.getenv("ROADMAP_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("ROADMAP_CACHE_TTL", "3600")),
+)
+METRICS.register_gauges("roadmap_cache", ROADMAP_CACHE.stats)
+
+
+# Colleges listed per guidance answer.
+COLLEGE_PAGE_SIZE = int(os.getenv("COLLEGE_PAGE_SIZE", "10"))
+
+# Background roadmap generation, so the prose answer does not wait behind it.
+_ROADMAP_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.getenv("ROADMAP_WORKERS", "4")),
+    thread_name_prefix="roadmap",
+)
+_INFLIGHT: Dict[tuple[str, str], Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+
+def _normalize_text(value: Any) -> str:
+    return " ".join(str(value or "").lower().split())
+
+
+def profile_fingerprint(profile: Dict[str, Any]) -> str:
+    """
+    Stable hash of the profile fields used by the roadmap prompt.
+    """
+    normalized = {field: _normalize_text(profile.get(field)) for field in ROADMAP_PROFILE_FIELDS}
+    payload = json.dumps(normalized, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def roadmap_cache_key(profile: Dict[str, Any], user_input: str) -> tuple[str, str]:
+    return profile_fingerprint(profile), _normalize_text(user_input)
+
+
+def _cached_roadmap(key: tuple[str, str], profile: Dict[str, Any], user_input: str) -> Dict[str, Any] | None:
+    """
+    ROADMAP_CACHE first, then a pre-generated roadmap for a common question shape
+    (see roadmap_warmup), which is copied into ROADMAP_CACHE for the next rerun.
+    """
+    roadmap = ROADMAP_CACHE.get(key)
+    if roadmap is None:
+        roadmap = lookup_warm_roadmap(profile, user_input)
+        if roadmap is not None:
+            ROADMAP_CACHE.set(key, roadmap)
+    return roadmap
+
+
+def generate_dynamic_roadmap(
+    profile: Dict[str, Any],
+    user_input: str,
+    use_cache: bool = True,
+    user: str | None = None,
+) -> Dict[str, Any] | None:
+    """
+    Return a structured roadmap object, served from ROADMAP_CACHE when the same
+    (profile, question) pair was answered recently. `user` picks the fair-queue
+    lane of the model call (see ai_client.LIMITER).
+    """
+    key = roadmap_cache_key(profile, user_input)
+    if use_cache:
+        cached = _cached_roadmap(key, profile, user_input)
+        if cached is not None:
+            return cached
+
+        # A background request for the same roadmap is already running: wait for it.
+        with _INFLIGHT_LOCK:
+            pending = _INFLIGHT.get(key)
+        if pending is not None:
+            return pending.result()
+
+    return _generate_and_cache(key, profile, user_input, use_cache, user)
+
+
+def submit_dynamic_roadmap(profile: Dict[str, Any], user_input: str, user: str | None = None) -> Future:
     """
-    Call Groq in JSON mode to generate a structured roadmap object.
+    Start generating a roadmap in the background and return a Future for it.
+    Cached roadmaps come back as an already-completed Future, and identical
+    requests that are still running share the same Future.
     """
+    key = roadmap_cache_key(profile, user_input)
+    cached = _cached_roadmap(key, profile, user_input)
+    if cached is not None:
+        done: Future = Future()
+        done.set_result(cached)
+        return done
+
+    with _INFLIGHT_LOCK:
+        pending = _INFLIGHT.get(key)
+        if pending is not None:
+            return pending
+        future = _ROADMAP_EXECUTOR.submit(_generate_and_cache, key, dict(profile), user_input, True, user)
+        _INFLIGHT[key] = future
+
+    future.add_done_callback(lambda _: _forget_inflight(key, future))
+    return future
+
+
+def _forget_inflight(key: tuple[str, str], future: Future) -> None:
+    with _INFLIGHT_LOCK:
+        if _INFLIGHT.get(key) is future:
+            del _INFLIGHT[key]
+
+
+@timed("roadmap_generate")
+def _generate_and_cache(
+    key: tuple[str, str],
+    profile: Dict[str, Any],
+    user_input: str,
+    use_cache: bool = True,
+    user: str | None = None,
+) -> Dict[str, Any] | None:
+    roadmap = _request_dynamic_roadmap(profile, user_input, use_cache, user)
+    # Failed generations are not cached so the next render can try again.
+    if roadmap is not None:
+        ROADMAP_CACHE.set(key, roadmap)
+    return roadmap
+
+
+def _roadmap_messages(profile: Dict[str, Any], user_input: str) -> List[Dict[str, str]]:
     system_prompt = "You are a structured JSON generator for career roadmaps."
-    user_prompt = build_dynamic_roadmap_prompt(profile, user_input)
+    user_prompt = build_dynamic_roadmap_prompt(profile, user_input, classify_intents(user_input))
 
-    messages = [
+    return [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": user_prompt},
     ]
 
-    response = call_ai_model(messages, response_format="json_object")
-    if not isinstance(response, str):
+
+def _request_dynamic_roadmap(
+    profile: Dict[str, Any],
+    user_input: str,
+    use_cache: bool = True,
+    user: str | None = None,
+) -> Dict[str, Any] | None:
+    """
+    Call Groq in JSON mode to generate a structured roadmap object. use_cache=False
+    also skips the response cache, so refreshes really ask the model again.
+    """
+    result = call_ai_model_result(
+        _roadmap_messages(profile, user_input), response_format="json_object", use_cache=use_cache, user=user
+    )
+    if not result.ok:
         return None
+    # Validates the shape and salvages truncated or wrapped JSON.
+    return parse_roadmap(result.text)
 
-    try:
-        return json.loads(response)
-    except Exception:
-        # Fallback: try to recover JSON if model added extra text
-        try:
-            start = response.find("{")
-            end = response.rfind("}")
-            if start != -1 and end != -1:
-                return json.loads(response[start : end + 1])
-        except Exception:
-            return None
-    return None
-
-
-def get_matching_colleges(roadmap_json: Dict[str, Any]) -> List[dict]:
-    matches: List[dict] = []
 
-    if not roadmap_json:
-        return matches
+def stream_dynamic_roadmap(
+    profile: Dict[str, Any],
+    user_input: str,
+    user: str | None = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield validated next_stages entries as soon as each one is complete in the
+    streamed response. Cached or already-running roadmaps are reused; the final
+    roadmap is cached like generate_dynamic_roadmap's. While it streams, the
+    request is registered in _INFLIGHT, so submit/generate calls for the same
+    roadmap wait for it instead of asking the model again.
+    """
+    key = roadmap_cache_key(profile, user_input)
+    roadmap = _cached_roadmap(key, profile, user_input)
+    future: Future | None = None
+    if roadmap is None:
+        with _INFLIGHT_LOCK:
+            pending = _INFLIGHT.get(key)
+            if pending is None:
+                future = Future()
+                future.set_running_or_notify_cancel()
+                _INFLIGHT[key] = future
+        if pending is not None:
+            roadmap = pending.result()
+    if roadmap is not None:
+        yield from roadmap["next_stages"]
+        return
 
-    keywords = [k.lower() for k in roadmap_json.get("college_keywords", [])]
-    budget = (roadmap_json.get("budget_preference") or "").lower()
+    # Waiters get None when the stream fails or its reader stops early, like a
+    # failed _generate_and_cache; nothing is cached, so the next call retries.
+    try:
+        parser = IncrementalRoadmapParser()
+        # Plain streaming without JSON mode: the prompt already asks for JSON only,
+        # and the parser skips any text around the object.
+        for delta in stream_ai_model(_roadmap_messages(profile, user_input), user=user):
+            if isinstance(delta, AIError):
+                # Keep the stages already shown, but never cache a cut-off roadmap.
+                return
+            yield from parser.feed(delta)
 
-    for college in COLLEGES:
-        course = college["course"].lower()
-        if keywords and not any(keyword in course for keyword in keywords):
-            continue
+        roadmap = parser.result()
+        if roadmap is None:
+            return
+        ROADMAP_CACHE.set(key, roadmap)
+        # Stages that only the final repair step could recover.
+        yield from roadmap["next_stages"][parser.stage_count :]
+    finally:
+        future.set_result(roadmap)
+        _forget_inflight(key, future)
 
-        if budget and college["budget"].lower() != budget:
-            continue
 
-        matches.append(college)
+def get_matching_colleges(
+    roadmap_json: Dict[str, Any],
+    page: int = 1,
+    page_size: int = COLLEGE_PAGE_SIZE,
+) -> List[dict]:
+    if not roadmap_json:
+        return []
 
-    return matches
+    return get_college_catalogue().search(
+        keywords=roadmap_json.get("college_keywords", []),
+        budget=roadmap_json.get("budget_preference") or None,
+        page=page,
+        page_size=page_size,
+    ).items
@@ -0,0 +1,230 @@
+import json
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List
+
+BUDGET_LEVELS = ("low", "medium", "high")
+
+
+def _as_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return ""
+    return " ".join(str(value).split())
+
+
+def _as_text_list(value: Any) -> List[str]:
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, list):
+        return []
+    return [text for text in (_as_text(v) for v in value) if text]
+
+
+@dataclass
+class RoadmapStage:
+    title: str
+    description: str = ""
+    entrance_exams: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "RoadmapStage | None":
+        """
+        Coerce one next_stages entry; returns None when it has neither title nor description.
+        """
+        if not isinstance(data, dict):
+            return None
+        title = _as_text(data.get("title"))
+        description = _as_text(data.get("description"))
+        if not title and not description:
+            return None
+        return cls(title, description, _as_text_list(data.get("entrance_exams")))
+
+
+@dataclass
+class Roadmap:
+    career_path: str = ""
+    current_stage: str = ""
+    next_stages: List[RoadmapStage] = field(default_factory=list)
+    college_keywords: List[str] = field(default_factory=list)
+    budget_preference: str = ""
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "Roadmap | None":
+        """
+        Validate model output, dropping malformed parts instead of rejecting the whole roadmap.
+        Returns None only when nothing usable is left.
+        """
+        if not isinstance(data, dict):
+            return None
+
+        stages = data.get("next_stages")
+        stages = stages if isinstance(stages, list) else []
+        budget = _as_text(data.get("budget_preference")).lower()
+
+        roadmap = cls(
+            career_path=_as_text(data.get("career_path")),
+            current_stage=_as_text(data.get("current_stage")),
+            next_stages=[s for s in (RoadmapStage.from_dict(item) for item in stages) if s],
+            college_keywords=[k.lower() for k in _as_text_list(data.get("college_keywords"))],
+            budget_preference=budget if budget in BUDGET_LEVELS else "",
+        )
+        if not (roadmap.next_stages or roadmap.career_path or roadmap.college_keywords):
+            return None
+        return roadmap
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def repair_json(text: str) -> str | None:
+    """
+    Best-effort fix for truncated or wrapped JSON: starts at the first "{", ignores
+    anything after the matching "}", and otherwise closes open strings, arrays and
+    objects. If the tail is not valid, it is cut back to the last complete element.
+    """
+    start = text.find("{")
+    if start == -1:
+        return None
+
+    stack: List[str] = []
+    in_string = False
+    escaped = False
+    # (position, closers) after which the text can be cut and closed cleanly
+    safe_points: List[tuple[int, str]] = []
+
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            if not stack:
+                break
+            stack.pop()
+            if not stack:
+                return text[start : i + 1]
+            safe_points.append((i + 1, "".join(reversed(stack))))
+        elif ch == ",":
+            safe_points.append((i, "".join(reversed(stack))))
+
+    tail = text[start:]
+    if in_string:
+        tail += '"'
+    candidates = [tail.rstrip().rstrip(",") + "".join(reversed(stack))]
+    candidates += [text[start:pos] + closers for pos, closers in reversed(safe_points)]
+
+    for candidate in candidates:
+        try:
+            json.loads(candidate)
+            return candidate
+        except ValueError:
+            continue
+    return None
+
+
+def parse_roadmap(text: str | None) -> Dict[str, Any] | None:
+    """
+    Parse and validate a roadmap response, salvaging partial output where possible.
+    """
+    if not text:
+        return None
+    try:
+        data = json.loads(text)
+    except ValueError:
+        repaired = repair_json(text)
+        if repaired is None:
+            return None
+        data = json.loads(repaired)
+
+    roadmap = Roadmap.from_dict(data)
+    return roadmap.to_dict() if roadmap else None
+
+
+class IncrementalRoadmapParser:
+    """
+    Feed streamed response text and get each next_stages entry back as soon as its
+    closing brace arrives, before the rest of the JSON is complete.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.stage_count = 0
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._last_string = ""
+        self._key_at_depth1 = ""
+        self._stages_depth: int | None = None
+        self._stage_start: int | None = None
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        self.text += chunk
+        completed: List[Dict[str, Any]] = []
+
+        text = self.text
+        while self._pos < len(text):
+            i = self._pos
+            ch = text[i]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._last_string = text[self._string_start : i]
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i + 1
+            elif ch == ":" and len(self._stack) == 1:
+                self._key_at_depth1 = self._last_string
+            elif ch in "{[":
+                self._stack.append(ch)
+                depth = len(self._stack)
+                if ch == "[" and depth == 2 and self._key_at_depth1 == "next_stages":
+                    self._stages_depth = depth
+                elif ch == "{" and self._stages_depth is not None and depth == self._stages_depth + 1:
+                    self._stage_start = i
+            elif ch in "}]":
+                if not self._stack:
+                    continue
+                depth = len(self._stack)
+                self._stack.pop()
+                if ch == "}" and self._stage_start is not None and depth == (self._stages_depth or 0) + 1:
+                    stage = self._parse_stage(text[self._stage_start : i + 1])
+                    self._stage_start = None
+                    if stage is not None:
+                        completed.append(stage)
+                elif ch == "]" and depth == self._stages_depth:
+                    self._stages_depth = None
+
+        self.stage_count += len(completed)
+        return completed
+
+    @staticmethod
+    def _parse_stage(raw: str) -> Dict[str, Any] | None:
+        try:
+            stage = RoadmapStage.from_dict(json.loads(raw))
+        except ValueError:
+            return None
+        return asdict(stage) if stage else None
+
+    def result(self) -> Dict[str, Any] | None:
+        return parse_roadmap(self.text)
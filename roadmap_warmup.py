@@ -0,0 +1,259 @@
+"""
+Pre-generated roadmaps for the most common question shapes.
+
+    python roadmap_warmup.py              # generate missing and stale entries
+    python roadmap_warmup.py --all        # regenerate everything
+
+Each entry covers one (education_level, interest, financial_constraint) combination
+from the profile form. Live requests whose profile and question map to the same
+combination get the stored roadmap instantly; stale entries are still served and
+refreshed in the background.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List
+
+from instrumentation import METRICS
+from intent import classify_intents
+from resume import EDUCATION_LEVELS, FINANCIAL_OPTIONS, empty_profile
+
+# Off unless ROADMAP_WARM_ENABLED is set; entries older than ROADMAP_WARM_MAX_AGE are refreshed.
+ROADMAP_WARM_ENABLED = os.getenv("ROADMAP_WARM_ENABLED", "0").lower() in ("1", "true", "yes")
+ROADMAP_WARM_PATH = os.getenv("ROADMAP_WARM_PATH", ".cache/warm_roadmaps.sqlite3")
+ROADMAP_WARM_MAX_AGE = float(os.getenv("ROADMAP_WARM_MAX_AGE", str(7 * 24 * 3600)))
+# A question only counts as a common shape when one intent clearly dominates it.
+ROADMAP_WARM_MIN_WEIGHT = float(os.getenv("ROADMAP_WARM_MIN_WEIGHT", "0.6"))
+
+# intent.classify_intents label -> interests text and question used for its warm roadmap.
+WARM_INTERESTS: Dict[str, tuple[str, str]] = {
+    "arts": ("arts, design, music", "I love arts and creative work, what can I study and do next?"),
+    "tech": ("coding, AI, machine learning", "I want to become a software engineer or work in AI/ML, what should I do next?"),
+    "medical": ("doctor, nursing, pharmacy", "I want to work in the medical field, what are my options and exams?"),
+    "law": ("law", "I want to become a lawyer, what is the path and which exams should I write?"),
+    "government": ("government job, UPSC", "I want a government job like UPSC or state PSC, how should I prepare?"),
+}
+
+
+def warm_signature(education_level: str, intent: str, budget: str) -> str:
+    return "|".join(" ".join(part.lower().split()) for part in (education_level, intent, budget))
+
+
+def warm_request(education_level: str, intent: str, budget: str) -> tuple[Dict[str, Any], str]:
+    """
+    The (profile, question) pair a warm roadmap is generated from.
+    """
+    interests, question = WARM_INTERESTS[intent]
+    profile = empty_profile()
+    profile.update(education_level=education_level, interests=interests, financial_constraint=budget)
+    return profile, question
+
+
+def warm_combinations() -> Iterator[tuple[str, str, str]]:
+    for education_level in EDUCATION_LEVELS:
+        for intent in WARM_INTERESTS:
+            for budget in FINANCIAL_OPTIONS:
+                yield education_level, intent, budget
+
+
+def match_signature(profile: Dict[str, Any], user_input: str) -> str | None:
+    """
+    Signature of the warm roadmap a live request can be answered with, or None when
+    the profile or question is not one of the common shapes.
+    """
+    education_level = profile.get("education_level") or ""
+    budget = profile.get("financial_constraint") or ""
+    if education_level not in EDUCATION_LEVELS or budget not in FINANCIAL_OPTIONS:
+        return None
+
+    # The question decides; profile interests are the fallback for vague questions.
+    intents = classify_intents(user_input) or classify_intents(profile.get("interests") or "")
+    if not intents or intents[0].weight < ROADMAP_WARM_MIN_WEIGHT or intents[0].label not in WARM_INTERESTS:
+        return None
+    return warm_signature(education_level, intents[0].label, budget)
+
+
+class WarmRoadmapStore:
+    """
+    SQLite table of pre-generated roadmaps keyed by warm_signature.
+    """
+
+    def __init__(self, path: str, max_age: float = ROADMAP_WARM_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS warm_roadmaps (
+                signature TEXT PRIMARY KEY,
+                education_level TEXT NOT NULL,
+                intent TEXT NOT NULL,
+                budget TEXT NOT NULL,
+                roadmap TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, signature: str) -> Dict[str, Any] | None:
+        """
+        Row as a dict with the parsed roadmap and a `stale` flag, or None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT education_level, intent, budget, roadmap, created_at FROM warm_roadmaps WHERE signature = ?",
+                (signature,),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            stale = row[4] + self.max_age < time.time()
+            self.hits += 1
+            self.stale_hits += stale
+        return {
+            "education_level": row[0],
+            "intent": row[1],
+            "budget": row[2],
+            "roadmap": json.loads(row[3]),
+            "created_at": row[4],
+            "stale": stale,
+        }
+
+    def put(self, education_level: str, intent: str, budget: str, roadmap: Dict[str, Any]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO warm_roadmaps VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    warm_signature(education_level, intent, budget),
+                    education_level,
+                    intent,
+                    budget,
+                    json.dumps(roadmap, ensure_ascii=False),
+                    time.time(),
+                ),
+            )
+            self._conn.commit()
+
+    def fresh_signatures(self) -> set[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT signature FROM warm_roadmaps WHERE created_at >= ?", (time.time() - self.max_age,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM warm_roadmaps").fetchone()[0]
+            total = self.hits + self.misses
+            return {
+                "size": size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale_hits": self.stale_hits,
+                "hit_ratio": (self.hits / total) if total else 0.0,
+            }
+
+
+WARM_STORE = WarmRoadmapStore(ROADMAP_WARM_PATH) if ROADMAP_WARM_ENABLED and ROADMAP_WARM_PATH else None
+if WARM_STORE is not None:
+    METRICS.register_gauges("warm_roadmaps", WARM_STORE.stats)
+
+_REFRESHING: set[str] = set()
+_REFRESHING_LOCK = threading.Lock()
+
+
+def generate_warm_roadmap(store: WarmRoadmapStore, education_level: str, intent: str, budget: str) -> bool:
+    from roadmap_engine import generate_dynamic_roadmap
+
+    profile, question = warm_request(education_level, intent, budget)
+    roadmap = generate_dynamic_roadmap(profile, question, use_cache=False)
+    if roadmap is None:
+        return False
+    store.put(education_level, intent, budget, roadmap)
+    return True
+
+
+def _refresh(store: WarmRoadmapStore, signature: str, education_level: str, intent: str, budget: str) -> None:
+    try:
+        generate_warm_roadmap(store, education_level, intent, budget)
+    finally:
+        with _REFRESHING_LOCK:
+            _REFRESHING.discard(signature)
+
+
+def lookup_warm_roadmap(profile: Dict[str, Any], user_input: str) -> Dict[str, Any] | None:
+    """
+    Stored roadmap for a near-matching common question, or None. A stale entry is
+    still returned, and one background refresh per signature is started on the
+    roadmap executor.
+    """
+    if WARM_STORE is None:
+        return None
+    signature = match_signature(profile, user_input)
+    if signature is None:
+        return None
+    entry = WARM_STORE.get(signature)
+    if entry is None:
+        return None
+
+    if entry["stale"]:
+        with _REFRESHING_LOCK:
+            start = signature not in _REFRESHING
+            _REFRESHING.add(signature)
+        if start:
+            from roadmap_engine import _ROADMAP_EXECUTOR
+
+            _ROADMAP_EXECUTOR.submit(
+                _refresh, WARM_STORE, signature, entry["education_level"], entry["intent"], entry["budget"]
+            )
+    return entry["roadmap"]
+
+
+def warm_all(store: WarmRoadmapStore, workers: int = 4, refresh_all: bool = False) -> Dict[str, int]:
+    """
+    Generate every combination that is missing or stale (or all of them with refresh_all).
+    """
+    fresh = set() if refresh_all else store.fresh_signatures()
+    todo = [combo for combo in warm_combinations() if warm_signature(*combo) not in fresh]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda combo: generate_warm_roadmap(store, *combo), todo))
+
+    return {
+        "combinations": len(list(warm_combinations())),
+        "skipped_fresh": len(fresh),
+        "generated": sum(results),
+        "failed": len(results) - sum(results),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Pre-generate roadmaps for common questions.")
+    parser.add_argument("--path", default=ROADMAP_WARM_PATH, help="SQLite file (default: ROADMAP_WARM_PATH)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--all", action="store_true", help="regenerate fresh entries too")
+    args = parser.parse_args(argv)
+
+    store = WarmRoadmapStore(args.path)
+    summary = warm_all(store, args.workers, args.all)
+    print(json.dumps(summary))
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator
+
+
+class _SharedStream:
+    """
+    Buffers chunks from one producer thread and replays them to any number of readers,
+    including readers that join after the stream has started.
+    """
+
+    def __init__(self):
+        self.chunks: list[Any] = []
+        self.done = False
+        self.error: BaseException | None = None
+        self._cond = threading.Condition()
+
+    def pump(self, iterator: Iterator[Any]) -> None:
+        try:
+            for chunk in iterator:
+                with self._cond:
+                    self.chunks.append(chunk)
+                    self._cond.notify_all()
+        except BaseException as e:
+            self.error = e
+        finally:
+            with self._cond:
+                self.done = True
+                self._cond.notify_all()
+
+    def reader(self) -> Iterator[Any]:
+        i = 0
+        while True:
+            with self._cond:
+                while i >= len(self.chunks) and not self.done:
+                    self._cond.wait()
+                if i >= len(self.chunks):
+                    if self.error is not None:
+                        raise self.error
+                    return
+                chunk = self.chunks[i]
+            i += 1
+            yield chunk
+
+
+class SingleFlight:
+    """
+    Collapses identical concurrent calls: the first caller for a key runs the
+    function, everyone arriving while it runs waits for and shares its result.
+    Per-key counters show how many calls were coalesced.
+    """
+
+    def __init__(self, max_tracked_keys: int = 1000):
+        self.max_tracked_keys = max_tracked_keys
+        self._inflight: Dict[Hashable, Future | asyncio.Task | _SharedStream] = {}
+        self._per_key: "OrderedDict[Hashable, Dict[str, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+
+    def _count(self, key: Hashable, coalesced: bool) -> None:
+        counters = self._per_key.get(key)
+        if counters is None:
+            counters = {"calls": 0, "coalesced": 0}
+            self._per_key[key] = counters
+            while len(self._per_key) > self.max_tracked_keys:
+                self._per_key.popitem(last=False)
+        else:
+            self._per_key.move_to_end(key)
+        counters["calls"] += 1
+        self.calls += 1
+        if coalesced:
+            counters["coalesced"] += 1
+            self.coalesced += 1
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> tuple[Any, bool]:
+        """
+        Returns (result, shared); shared is True when another caller did the work.
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+            self._count(key, coalesced=not leader)
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        return result, False
+
+    async def do_async(self, key: Hashable, make_coro: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """
+        Async counterpart of do(). All callers for a key must share one event loop.
+        A caller that is cancelled stops waiting without cancelling the shared call.
+        """
+        with self._lock:
+            task = self._inflight.get(key)
+            leader = task is None
+            if leader:
+                task = asyncio.ensure_future(make_coro())
+                self._inflight[key] = task
+                task.add_done_callback(lambda done: self._forget(key, done))
+            self._count(key, coalesced=not leader)
+        return await asyncio.shield(task), not leader
+
+    def _forget(self, key: Hashable, entry: Any) -> None:
+        with self._lock:
+            if self._inflight.get(key) is entry:
+                del self._inflight[key]
+
+    def do_stream(self, key: Hashable, make_iterator: Callable[[], Iterator[Any]]) -> tuple[Iterator[Any], bool]:
+        """
+        Streaming counterpart of do(): one background thread consumes the real
+        iterator and every caller with the same key reads the same chunks, so a
+        reader that stops early does not cut the stream off for the others.
+        """
+        with self._lock:
+            shared = self._inflight.get(key)
+            leader = shared is None
+            if leader:
+                shared = _SharedStream()
+                self._inflight[key] = shared
+            self._count(key, coalesced=not leader)
+
+        if leader:
+            def run() -> None:
+                try:
+                    shared.pump(make_iterator())
+                finally:
+                    with self._lock:
+                        del self._inflight[key]
+
+            threading.Thread(target=run, name="single-flight-stream", daemon=True).start()
+
+        return shared.reader(), not leader
+
+    def stats(self, top: int = 20) -> Dict[str, Any]:
+        with self._lock:
+            busiest = sorted(self._per_key.items(), key=lambda kv: kv[1]["coalesced"], reverse=True)[:top]
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._inflight),
+                "keys": {str(key)[:24]: dict(counters) for key, counters in busiest},
+            }
@@ -0,0 +1,114 @@
+import os
+import re
+from typing import Any, Dict, List
+
+from prompts import build_support_system_prompt
+from token_estimate import estimate_message_tokens, estimate_tokens
+
+# Input-token budget for one SoulFriend request (system + summary + turns + new message).
+SUPPORT_CONTEXT_BUDGET = int(os.getenv("SUPPORT_CONTEXT_BUDGET", "2500"))
+# Most recent history messages that are always kept verbatim when they fit.
+SUPPORT_RECENT_MESSAGES = int(os.getenv("SUPPORT_RECENT_MESSAGES", "6"))
+# Share of the budget the rolling summary may use.
+SUPPORT_SUMMARY_SHARE = 0.25
+
+# Messages containing any of these get the emergency footer after the reply.
+SELF_HARM_PHRASES = (
+    "end my life",
+    "kill myself",
+    "suicide",
+    "don't want to live",
+    "hurt myself",
+)
+
+EMERGENCY_FOOTER = (
+    "\n\n⚠️ If you feel you might hurt yourself or are in immediate danger, "
+    "please contact local emergency services or a trusted adult right now. "
+    "This tool cannot handle emergencies."
+)
+
+
+def mentions_self_harm(message: str) -> bool:
+    lowered = message.lower()
+    return any(phrase in lowered for phrase in SELF_HARM_PHRASES)
+
+
+def add_emergency_footer(text: str) -> str:
+    return text + EMERGENCY_FOOTER
+
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s")
+
+
+def _first_sentence(text: str, limit: int = 160) -> str:
+    text = " ".join(text.split())
+    sentence = _SENTENCE_END_RE.split(text, maxsplit=1)[0]
+    if len(sentence) > limit:
+        sentence = sentence[: limit - 1].rstrip() + "…"
+    return sentence
+
+
+class SupportContextWindow:
+    """
+    Builds the message list for the SoulFriend chat within a token budget.
+
+    The profile goes into the system message once. Recent turns are sent verbatim;
+    turns that no longer fit are folded, oldest first, into a short extractive
+    summary that is kept between requests, so each turn is only summarized once.
+    """
+
+    def __init__(
+        self,
+        budget: int = SUPPORT_CONTEXT_BUDGET,
+        recent_messages: int = SUPPORT_RECENT_MESSAGES,
+    ):
+        self.budget = budget
+        self.recent_messages = recent_messages
+        self.summary_lines: List[str] = []
+        self.folded = 0
+
+    def reset(self) -> None:
+        self.summary_lines = []
+        self.folded = 0
+
+    def _fold(self, history: List[Dict[str, Any]], upto: int) -> None:
+        if upto <= self.folded:
+            return
+        for msg in history[self.folded : upto]:
+            if msg["role"] == "user":
+                self.summary_lines.append(f"She shared: {_first_sentence(msg['content'])}")
+            else:
+                self.summary_lines.append(f"You replied: {_first_sentence(msg['content'])}")
+        self.folded = upto
+
+        summary_budget = int(self.budget * SUPPORT_SUMMARY_SHARE)
+        while self.summary_lines and estimate_tokens("\n".join(self.summary_lines)) > summary_budget:
+            self.summary_lines.pop(0)
+
+    def _system_message(self, profile: Dict[str, Any]) -> Dict[str, str]:
+        content = build_support_system_prompt(profile)
+        if self.summary_lines:
+            content += "\nEarlier in this conversation (summary):\n" + "\n".join(self.summary_lines)
+        return {"role": "system", "content": content}
+
+    def build_messages(
+        self,
+        profile: Dict[str, Any],
+        history: List[Dict[str, Any]],
+        new_message: str,
+    ) -> List[Dict[str, str]]:
+        if self.folded > len(history):
+            # history was cleared outside of reset()
+            self.reset()
+
+        new_turn = {"role": "user", "content": new_message}
+
+        # Keep as many of the latest messages as fit; older ones join the rolling summary.
+        start = max(self.folded, len(history) - self.recent_messages)
+        while True:
+            self._fold(history, start)
+            recent = [{"role": m["role"], "content": m["content"]} for m in history[start:]]
+            messages = [self._system_message(profile)] + recent + [new_turn]
+            if estimate_message_tokens(messages) <= self.budget or start >= len(history):
+                return messages
+            start += 1
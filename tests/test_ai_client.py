@@ -0,0 +1,51 @@
+import threading
+from types import SimpleNamespace
+
+import ai_client
+from fair_queue import FairLimiter
+from groq_client import AIError, AIErrorKind
+
+
+class _RecordingClient:
+    """
+    Groq stand-in whose streaming create() records the timeout it was given.
+    """
+
+    def __init__(self):
+        self.timeouts = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, timeout, **kwargs):
+        self.timeouts.append(timeout)
+        delta = SimpleNamespace(content="hello")
+        return iter([SimpleNamespace(choices=[SimpleNamespace(delta=delta)], x_groq=None)])
+
+
+def test_stream_deadline_includes_the_slot_wait(monkeypatch):
+    fake = _RecordingClient()
+    limiter = FairLimiter(1)
+    monkeypatch.setattr(ai_client, "client", fake)
+    monkeypatch.setattr(ai_client, "LIMITER", limiter)
+    monkeypatch.setattr(ai_client, "GROQ_DEADLINE", 1.0)
+    monkeypatch.setattr(ai_client, "GROQ_TIMEOUT", 5.0)
+
+    limiter.acquire("other")
+    threading.Timer(0.4, limiter.release).start()
+    assert list(ai_client._limited_stream([{"role": "user", "content": "hi"}], None, None, "me")) == ["hello"]
+
+    # The attempt only gets what is left of the one deadline after waiting for a slot.
+    assert 0.3 < fake.timeouts[0] < 0.7
+    assert limiter.stats()["active"] == 0
+
+
+def test_stream_slot_timeout_is_reported_out_of_band(monkeypatch):
+    limiter = FairLimiter(1)
+    monkeypatch.setattr(ai_client, "client", _RecordingClient())
+    monkeypatch.setattr(ai_client, "LIMITER", limiter)
+    monkeypatch.setattr(ai_client, "GROQ_DEADLINE", 0.05)
+
+    limiter.acquire("other")
+    items = list(ai_client._limited_stream([{"role": "user", "content": "hi"}], None, None, "me"))
+    assert len(items) == 1
+    assert isinstance(items[0], AIError)
+    assert items[0].kind == AIErrorKind.TIMEOUT
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+import ai_client
+import api_server
+from benchmarks.fake_groq import FakeGroq
+from groq_client import AIError, AIErrorKind, AIResult
+
+PROFILE = {"education_level": "12th / Inter", "interests": "coding, AI"}
+
+
+@pytest.fixture(autouse=True)
+def fake_groq(monkeypatch):
+    fake = FakeGroq(latency=0.0, tokens_per_second=100000)
+    monkeypatch.setattr(ai_client, "client", fake)
+    monkeypatch.setattr(ai_client, "async_client", fake.as_async())
+    return fake
+
+
+def _request(method, path, **kwargs):
+    async def run():
+        transport = httpx.ASGITransport(app=api_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://api") as client:
+            return await client.request(method, path, **kwargs)
+
+    return asyncio.run(run())
+
+
+def _lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_routing():
+    assert _request("GET", "/healthz").json() == {"status": "ok"}
+    assert _request("GET", "/nope").status_code == 404
+    assert _request("GET", "/v1/support").status_code == 405
+    assert "# TYPE" in _request("GET", "/metrics").text
+
+
+@pytest.mark.parametrize(
+    "path, kwargs, message",
+    [
+        ("/v1/support", {"content": b"{bad"}, "body must be valid JSON"),
+        ("/v1/support", {"json": [1, 2]}, "body must be a JSON object"),
+        ("/v1/support", {"json": {"message": " "}}, "'message' is required"),
+        ("/v1/support", {"json": {"message": "hi", "history": "nope"}}, "'history' must be a list"),
+        ("/v1/support", {"json": {"message": "hi", "history": [{"role": "system", "content": "x"}]}}, "'history'"),
+        ("/v1/roadmap", {"json": {"question": "x", "page_size": 0}}, "'page_size' must be an integer"),
+        ("/v1/roadmap", {"json": {"question": "x", "profile": "me"}}, "'profile' must be an object"),
+    ],
+)
+def test_validation_errors_are_400(path, kwargs, message):
+    response = _request("POST", path, **kwargs)
+    assert response.status_code == 400
+    assert response.json()["error"].startswith(message)
+
+
+def test_body_size_limit(monkeypatch):
+    monkeypatch.setattr(api_server, "API_MAX_BODY", 10)
+    assert _request("POST", "/v1/support", json={"message": "a long enough message"}).status_code == 413
+
+
+def test_roadmap_with_colleges():
+    response = _request("POST", "/v1/roadmap", json={"profile": PROFILE, "question": "api test: what after 12th?"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["roadmap"]["next_stages"]
+    assert set(body["colleges"]) == {"items", "total", "page", "pages"}
+
+
+def test_streamed_answer_ends_with_done():
+    response = _request(
+        "POST", "/v1/guidance", json={"profile": PROFILE, "question": "api test: which degree?", "stream": True}
+    )
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = _lines(response)
+    assert lines[-1]["done"] is True
+    assert "".join(line["delta"] for line in lines[:-1]) == lines[-1]["answer"]
+
+
+def test_stream_failure_gives_an_error_line(monkeypatch):
+    def failing_stream(messages, use_cache=True, user=None):
+        yield "I hear"
+        yield AIError(AIErrorKind.CONNECTION)
+
+    monkeypatch.setattr(api_server, "stream_ai_model", failing_stream)
+    response = _request("POST", "/v1/support", json={"message": "I want to kill myself", "stream": True})
+
+    lines = _lines(response)
+    assert lines[0] == {"delta": "I hear"}
+    # The emergency footer still goes out before the error.
+    assert lines[1]["delta"].startswith("\n\n⚠️")
+    assert lines[2] == {"error": AIError(AIErrorKind.CONNECTION).user_message, "retryable": True}
+    assert not any(line.get("done") for line in lines)
+
+
+def test_model_failure_without_streaming_is_503(monkeypatch):
+    async def failing_call(messages, use_cache=True, user=None, **kwargs):
+        return AIResult(error=AIError(AIErrorKind.RATE_LIMITED))
+
+    monkeypatch.setattr(api_server, "acall_ai_model_result", failing_call)
+    response = _request("POST", "/v1/support", json={"message": "hello"})
+    assert response.status_code == 503
+    assert response.json() == {"error": AIError(AIErrorKind.RATE_LIMITED).user_message}
+
+
+def test_request_timeout_is_504(monkeypatch):
+    async def slow_call(messages, use_cache=True, user=None, **kwargs):
+        await asyncio.sleep(1)
+
+    monkeypatch.setattr(api_server, "acall_ai_model_result", slow_call)
+    monkeypatch.setattr(api_server, "API_REQUEST_TIMEOUT", 0.05)
+    response = _request("POST", "/v1/support", json={"message": "hello"})
+    assert response.status_code == 504
+
+
+def test_stream_timeout_ends_with_an_error_line(monkeypatch):
+    def slow_stream(messages, use_cache=True, user=None):
+        yield "first"
+        time.sleep(0.5)
+        yield "too late"
+
+    monkeypatch.setattr(api_server, "stream_ai_model", slow_stream)
+    monkeypatch.setattr(api_server, "API_STREAM_TIMEOUT", 0.1)
+    response = _request("POST", "/v1/support", json={"message": "hello", "stream": True})
+    assert _lines(response) == [{"delta": "first"}, {"error": "request timed out"}]
+
+
+def test_user_header_picks_the_fair_queue_lane(monkeypatch):
+    seen = {}
+
+    async def recording_call(messages, use_cache=True, user=None, **kwargs):
+        seen.update(user=user, use_cache=use_cache)
+        return AIResult(text="ok")
+
+    monkeypatch.setattr(api_server, "acall_ai_model_result", recording_call)
+    response = _request("POST", "/v1/support", json={"message": "hello"}, headers={"x-user-id": "asha"})
+    assert response.json() == {"answer": "ok"}
+    # Support replies are never cached.
+    assert seen == {"user": "asha", "use_cache": False}
@@ -0,0 +1,50 @@
+from college_catalogue import ALIAS_TABLE, CollegeCatalogue
+
+COLLEGES = [
+    {"name": "North Engineering College", "course": "Engineering", "budget": "Low", "location": "Hyderabad"},
+    {"name": "South Medical College", "course": "Medical", "budget": "High", "location": "Chennai"},
+    {"name": "East Engineering Institute", "course": "Engineering", "budget": "High", "location": "Pune"},
+    {"name": "West Law School", "course": "Law", "budget": "Low", "location": "Hyderabad"},
+    {"name": "Central Dance Academy", "course": "Dance", "budget": "Low", "location": "Chennai"},
+]
+
+
+def _names(page):
+    return [college["name"] for college in page.items]
+
+
+def test_substring_match_on_course_names():
+    catalogue = CollegeCatalogue(COLLEGES)
+    assert _names(catalogue.search(["engineering"])) == ["North Engineering College", "East Engineering Institute"]
+
+
+def test_aliases_map_to_courses():
+    catalogue = CollegeCatalogue(COLLEGES)
+    assert ALIAS_TABLE["cse"] == ("engineering",)
+    assert _names(catalogue.search(["cse"])) == _names(catalogue.search(["engineering"]))
+    assert _names(catalogue.search(["MBBS"])) == ["South Medical College"]
+    # Punctuation and spacing variants resolve to the same alias.
+    assert _names(catalogue.search(["B. Tech"])) == _names(catalogue.search(["btech"]))
+
+
+def test_fuzzy_match_for_misspellings():
+    catalogue = CollegeCatalogue(COLLEGES)
+    assert _names(catalogue.search(["enginering"])) == ["North Engineering College", "East Engineering Institute"]
+    assert catalogue.search(["zzzzzz"]).items == []
+
+
+def test_budget_and_location_filters():
+    catalogue = CollegeCatalogue(COLLEGES)
+    assert _names(catalogue.search(["engineering"], budget="low")) == ["North Engineering College"]
+    assert _names(catalogue.search(location="hyderabad")) == ["North Engineering College", "West Law School"]
+
+
+def test_ranked_by_number_of_matching_keywords_and_paged():
+    catalogue = CollegeCatalogue(COLLEGES)
+    page = catalogue.search(["law", "legal", "engineering"], page=1, page_size=2)
+    assert _names(page) == ["West Law School", "North Engineering College"]
+    assert page.total == 3
+    assert page.pages == 2
+    assert _names(catalogue.search(["law", "legal", "engineering"], page=2, page_size=2)) == [
+        "East Engineering Institute"
+    ]
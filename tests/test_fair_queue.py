@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from fair_queue import FairLimiter, SlotTimeout
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.001)
+
+
+def test_free_slots_are_granted_immediately():
+    limiter = FairLimiter(2)
+    limiter.acquire("a")
+    limiter.acquire("b")
+    assert limiter.stats()["active"] == 2
+    assert limiter.stats()["granted_immediately"] == 2
+    limiter.release()
+    limiter.release()
+    assert limiter.stats()["active"] == 0
+
+
+def test_freed_slots_go_round_robin_across_users():
+    limiter = FairLimiter(1)
+    limiter.acquire("holder")
+    order = []
+
+    def wait(user, name):
+        limiter.acquire(user)
+        order.append(name)
+        limiter.release()
+
+    threads = []
+    # Queue three requests from "a", then one from "b".
+    for user, name in [("a", "a1"), ("a", "a2"), ("a", "a3"), ("b", "b1")]:
+        waiting = limiter.stats()["waiting"]
+        thread = threading.Thread(target=wait, args=(user, name))
+        thread.start()
+        threads.append(thread)
+        _wait_for(lambda: limiter.stats()["waiting"] == waiting + 1)
+
+    limiter.release()
+    for thread in threads:
+        thread.join(2)
+
+    # "b" is served after a1 instead of waiting behind all of a's requests.
+    assert order == ["a1", "b1", "a2", "a3"]
+    stats = limiter.stats()
+    assert stats["active"] == 0
+    assert stats["waiting"] == 0
+    assert stats["granted_after_wait"] == 4
+
+
+def test_acquire_times_out_and_leaves_the_queue():
+    limiter = FairLimiter(1)
+    limiter.acquire("a")
+    with pytest.raises(SlotTimeout):
+        limiter.acquire("b", timeout=0.05)
+
+    stats = limiter.stats()
+    assert stats["timeouts"] == 1
+    assert stats["waiting"] == 0
+    limiter.release()
+    assert limiter.stats()["active"] == 0
+
+
+def test_acquire_async_times_out():
+    limiter = FairLimiter(1)
+    limiter.acquire("a")
+
+    async def main():
+        with pytest.raises(SlotTimeout):
+            await limiter.acquire_async("b", timeout=0.05)
+
+    asyncio.run(main())
+    assert limiter.stats()["timeouts"] == 1
+    assert limiter.stats()["waiting"] == 0
+
+
+def test_cancelled_async_waiter_does_not_keep_a_slot():
+    limiter = FairLimiter(1)
+    limiter.acquire("a")
+
+    async def main():
+        task = asyncio.ensure_future(limiter.acquire_async("b"))
+        await asyncio.sleep(0.01)
+        assert limiter.stats()["waiting"] == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert limiter.stats()["waiting"] == 0
+    limiter.release()
+    assert limiter.stats()["active"] == 0
+
+
+def test_slot_async_hands_over_to_waiting_coroutines():
+    limiter = FairLimiter(1)
+    order = []
+
+    async def job(user, name):
+        async with limiter.slot_async(user):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(job("a", "a1"), job("a", "a2"), job("a", "a3"), job("b", "b1"))
+
+    asyncio.run(main())
+    # a1 takes the free slot; then the queued users alternate.
+    assert order == ["a1", "a2", "b1", "a3"]
+    assert limiter.stats()["active"] == 0
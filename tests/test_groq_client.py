@@ -0,0 +1,128 @@
+import time
+
+import groq
+import httpx
+import pytest
+
+from groq_client import (
+    AIErrorKind,
+    AIRequestFailed,
+    CircuitBreaker,
+    RetryPolicy,
+    _attempt_timeout,
+    _parse_retry_after,
+    run_with_retries,
+)
+
+
+def _connection_error():
+    return groq.APIConnectionError(request=httpx.Request("POST", "https://api.groq.com"))
+
+
+def _open_breaker(reset_timeout=0.05):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=reset_timeout)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_breaker_half_open_lets_one_trial_through():
+    breaker = _open_breaker()
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+
+def test_breaker_half_open_success_closes():
+    breaker = _open_breaker()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_breaker_half_open_failure_reopens():
+    breaker = _open_breaker()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_expired_deadline_does_not_claim_the_half_open_trial():
+    breaker = _open_breaker()
+    time.sleep(0.06)
+    with pytest.raises(AIRequestFailed) as info:
+        _attempt_timeout(breaker, 5.0, time.monotonic() - 1)
+    assert info.value.error.kind == AIErrorKind.TIMEOUT
+    # The trial is still available to the next caller.
+    assert breaker.allow()
+
+
+def test_attempt_timeout_is_capped_by_the_deadline():
+    breaker = CircuitBreaker()
+    assert _attempt_timeout(breaker, 5.0, time.monotonic() + 0.5) <= 0.5
+    assert _attempt_timeout(breaker, 0.2, time.monotonic() + 10) == 0.2
+
+
+def test_run_with_retries_retries_retryable_errors():
+    breaker = CircuitBreaker()
+    calls = []
+
+    def request(timeout):
+        calls.append(timeout)
+        if len(calls) < 2:
+            raise _connection_error()
+        return "ok"
+
+    policy = RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.01)
+    assert run_with_retries(request, policy, breaker, attempt_timeout=1.0, deadline=5.0) == "ok"
+    assert len(calls) == 2
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_run_with_retries_gives_up_after_max_attempts():
+    breaker = CircuitBreaker(failure_threshold=10)
+
+    def request(timeout):
+        raise _connection_error()
+
+    policy = RetryPolicy(max_attempts=2, base_delay=0.01, max_delay=0.01)
+    with pytest.raises(AIRequestFailed) as info:
+        run_with_retries(request, policy, breaker, attempt_timeout=1.0, deadline=5.0)
+    assert info.value.error.kind == AIErrorKind.CONNECTION
+
+
+def test_run_with_retries_rejects_calls_while_open():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    with pytest.raises(AIRequestFailed) as info:
+        run_with_retries(lambda timeout: "ok", RetryPolicy(), breaker, attempt_timeout=1.0, deadline=5.0)
+    assert info.value.error.kind == AIErrorKind.CIRCUIT_OPEN
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({"retry-after-ms": "1500"}, 1.5),
+        ({"retry-after": "3"}, 3.0),
+        ({"retry-after": "not a date"}, None),
+        ({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}, 0.0),
+        ({}, None),
+    ],
+)
+def test_parse_retry_after(headers, expected):
+    assert _parse_retry_after(headers) == expected
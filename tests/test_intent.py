@@ -0,0 +1,43 @@
+from intent import classify_intents
+
+
+def _labels(text):
+    return [intent.label for intent in classify_intents(text)]
+
+
+def test_matches_on_word_boundaries_only():
+    assert _labels("She said she wants to start early") == []
+    assert _labels("I want to work in AI") == ["tech"]
+
+
+def test_person_nouns_match_their_field():
+    # All of these matched through the old substring scan ("sing" in "singer", ...).
+    for text in (
+        "I want to be a singer",
+        "I want to become a dancer",
+        "I am an artist",
+        "My dream is to be a musician",
+        "I want to be a painter or a fashion designer",
+    ):
+        assert _labels(text) == ["arts"], text
+    for text in ("I want to be a programmer", "I am a self-taught coder"):
+        assert _labels(text) == ["tech"], text
+
+
+def test_multi_word_phrases_and_plurals():
+    intents = classify_intents("Machine   learning or maybe government jobs?")
+    assert {intent.label for intent in intents} == {"tech", "government"}
+    tech = next(intent for intent in intents if intent.label == "tech")
+    assert tech.matches == ("machine learning",)
+
+
+def test_weights_are_shares_of_all_matches_strongest_first():
+    intents = classify_intents("coding, programming and software, or maybe law")
+    assert [intent.label for intent in intents] == ["tech", "law"]
+    assert intents[0].weight == 0.75
+    assert intents[1].weight == 0.25
+
+
+def test_empty_text():
+    assert classify_intents("") == []
+    assert classify_intents(None) == []
@@ -0,0 +1,71 @@
+import pytest
+
+from prompts import (
+    GUIDANCE_USER,
+    PROMPT_REGISTRY,
+    PromptTemplate,
+    build_guidance_messages,
+    prompt_token_report,
+)
+from instrumentation import METRICS
+from resume import empty_profile
+
+
+def test_render_matches_str_format():
+    text = "Static {{literal}} part. Age: {age}, goals: {goals}. End."
+    template = PromptTemplate("t", text)
+    assert template.fields == ("age", "goals")
+    assert template.render(age=17, goals="doctor") == text.format(age=17, goals="doctor")
+
+
+def test_static_prefix_stops_at_the_first_field():
+    template = PromptTemplate("t", "Fixed instructions. Question: {question}")
+    assert template.static_prefix == "Fixed instructions. Question: "
+    assert template.static_tokens > 0
+
+
+def test_fully_static_prompt_is_rendered_once():
+    template = PromptTemplate("t", "No fields {{here}}")
+    assert template.fields == ()
+    first = template.render()
+    assert first == "No fields {here}"
+    assert template.render() is first
+
+
+def test_missing_field_raises():
+    template = PromptTemplate("t", "Hello {name}")
+    with pytest.raises(KeyError):
+        template.render()
+
+
+def test_render_stats():
+    template = PromptTemplate("t", "Hello {name}")
+    template.render(name="a")
+    template.render(name="b")
+    stats = template.stats()
+    assert stats["renders"] == 2
+    assert stats["fields"] == ["name"]
+
+
+def test_guidance_prompts_share_a_static_prefix():
+    profile = empty_profile()
+    first = build_guidance_messages(dict(profile, interests="coding"), "What after 12th?")
+    second = build_guidance_messages(dict(profile, interests="music"), "Which degree?")
+
+    # Identical system message and user-prompt prefix, whatever the profile and question.
+    assert first[0] == second[0]
+    assert first[1]["content"].startswith(GUIDANCE_USER.static_prefix)
+    assert second[1]["content"].startswith(GUIDANCE_USER.static_prefix)
+
+
+def test_registry_report_covers_registered_prompts():
+    report = prompt_token_report()
+    assert set(report) == set(PROMPT_REGISTRY)
+    assert "guidance_user" in report
+
+
+def test_token_report_is_exported_as_gauges():
+    build_guidance_messages(empty_profile(), "What after 12th?")
+    gauges = METRICS.snapshot()["gauges"]
+    assert gauges["herpath_prompts_guidance_user_static_prefix_tokens"] == GUIDANCE_USER.static_tokens
+    assert gauges["herpath_prompts_guidance_user_renders"] >= 1
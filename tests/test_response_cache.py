@@ -0,0 +1,68 @@
+import response_cache
+from response_cache import ResponseCache, SQLiteResponseStore, make_cache_key
+from ttl_cache import TTLCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        # Every call moves time on, so LRU order never depends on timestamp ties.
+        self.now += 1
+        return self.now
+
+
+def test_cache_key_depends_on_everything_that_changes_the_answer():
+    messages = [{"role": "user", "content": "hi"}]
+    key = make_cache_key("model", messages, None)
+    assert key == make_cache_key("model", [{"content": "hi", "role": "user"}], None)
+    assert key != make_cache_key("other", messages, None)
+    assert key != make_cache_key("model", messages, "json_object")
+    assert key != make_cache_key("model", [{"role": "user", "content": "hello"}], None)
+
+
+def test_sqlite_store_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache" / "responses.sqlite3")
+    SQLiteResponseStore(path).set("k", "answer")
+    assert SQLiteResponseStore(path).get("k") == "answer"
+
+
+def test_sqlite_store_drops_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(response_cache.time, "time", _Clock())
+    store = SQLiteResponseStore(str(tmp_path / "r.sqlite3"), max_entries=2)
+    store.set("a", "1")
+    store.set("b", "2")
+    assert store.get("a") == "1"
+    store.set("c", "3")
+    assert store.get("b") is None
+    assert store.get("a") == "1"
+    assert store.stats()["size"] == 2
+
+
+def test_sqlite_store_expires_old_rows(tmp_path, monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(response_cache.time, "time", clock)
+    store = SQLiteResponseStore(str(tmp_path / "r.sqlite3"), ttl=100)
+    store.set("a", "1")
+    clock.now += 200
+    assert store.get("a") is None
+    assert store.stats()["size"] == 0
+
+
+def test_disk_hits_are_promoted_to_memory(tmp_path):
+    disk = SQLiteResponseStore(str(tmp_path / "r.sqlite3"))
+    disk.set("k", "answer")
+    cache = ResponseCache(TTLCache(maxsize=8, ttl=60), disk)
+
+    assert cache.get("k") == "answer"
+    assert cache.memory.get("k") == "answer"
+    assert cache.stats()["disk"]["hits"] == 1
+
+
+def test_memory_only_cache():
+    cache = ResponseCache(TTLCache(maxsize=8, ttl=60))
+    assert cache.get("k") is None
+    cache.set("k", "answer")
+    assert cache.get("k") == "answer"
+    assert cache.stats()["disk"] is None
@@ -0,0 +1,51 @@
+import json
+
+import resume_batch
+
+
+def test_cli_reports_bad_lines_and_renders_the_rest(tmp_path, capsys):
+    profiles = tmp_path / "profiles.jsonl"
+    profiles.write_text(
+        "\n".join(
+            [
+                json.dumps({"name": "Asha", "education_level": "12th / Inter"}),
+                "{not json}",
+                json.dumps({"name": "Meera", "photo_path": str(tmp_path / "missing.png")}),
+                "[1, 2]",
+            ]
+        )
+        + "\n",
+        encoding="utf-8",
+    )
+    out_dir = tmp_path / "out"
+    report = tmp_path / "report.json"
+
+    code = resume_batch.main(
+        [str(profiles), "--out-dir", str(out_dir), "--workers", "1", "--report", str(report)]
+    )
+
+    assert code == 1
+    assert [p.name for p in out_dir.iterdir()] == ["00001_Asha.pdf"]
+    assert (out_dir / "00001_Asha.pdf").read_bytes().startswith(b"%PDF")
+
+    data = json.loads(report.read_text(encoding="utf-8"))
+    assert data["summary"]["documents"] == 1
+    assert data["summary"]["failed"] == 3
+    failures = {failure["line"]: failure["error"] for failure in data["failures"]}
+    assert set(failures) == {2, 3, 4}
+    assert failures[2].startswith("invalid JSON")
+    assert "FileNotFoundError" in failures[3]
+    assert "expected a JSON object" in failures[4]
+    assert "line 2: invalid JSON" in capsys.readouterr().err
+
+
+def test_colliding_explicit_file_names_get_the_line_number(tmp_path):
+    profiles = tmp_path / "profiles.jsonl"
+    profiles.write_text(
+        json.dumps({"name": "A", "file_name": "cv.pdf"}) + "\n" + json.dumps({"name": "B", "file_name": "cv.pdf"}) + "\n",
+        encoding="utf-8",
+    )
+    out_dir = tmp_path / "out"
+
+    assert resume_batch.main([str(profiles), "--out-dir", str(out_dir), "--workers", "1"]) == 0
+    assert sorted(p.name for p in out_dir.iterdir()) == ["cv.pdf", "cv_00002.pdf"]
@@ -0,0 +1,75 @@
+import json
+
+from roadmap_schema import IncrementalRoadmapParser, parse_roadmap, repair_json
+
+ROADMAP = {
+    "career_path": "Software engineer",
+    "current_stage": "Finished 12th",
+    "next_stages": [
+        {"title": "B.Tech in CSE", "description": "Four-year degree", "entrance_exams": ["JEE Main"]},
+        {"title": "Internships", "description": "Build projects", "entrance_exams": []},
+    ],
+    "college_keywords": ["Engineering", "CSE"],
+    "budget_preference": "low",
+}
+
+
+def test_parse_roadmap_accepts_valid_json():
+    roadmap = parse_roadmap(json.dumps(ROADMAP))
+    assert roadmap["career_path"] == "Software engineer"
+    assert [s["title"] for s in roadmap["next_stages"]] == ["B.Tech in CSE", "Internships"]
+    assert roadmap["college_keywords"] == ["engineering", "cse"]
+
+
+def test_parse_roadmap_drops_malformed_parts():
+    data = dict(ROADMAP, next_stages=[{"title": "Ok"}, "junk", {}], budget_preference="cheap")
+    roadmap = parse_roadmap(json.dumps(data))
+    assert [s["title"] for s in roadmap["next_stages"]] == ["Ok"]
+    assert roadmap["budget_preference"] == ""
+
+
+def test_parse_roadmap_rejects_unusable_output():
+    assert parse_roadmap(None) is None
+    assert parse_roadmap("no json here") is None
+    assert parse_roadmap(json.dumps({"next_stages": []})) is None
+
+
+def test_repair_json_strips_surrounding_text():
+    text = "Here you go:\n```json\n" + json.dumps(ROADMAP) + "\n```"
+    assert json.loads(repair_json(text)) == ROADMAP
+
+
+def test_repair_json_closes_truncated_output():
+    text = json.dumps(ROADMAP)
+    truncated = text[: text.index("Internships") + 5]
+    repaired = json.loads(repair_json(truncated))
+    assert repaired["career_path"] == "Software engineer"
+    assert repaired["next_stages"][0]["title"] == "B.Tech in CSE"
+
+
+def test_incremental_parser_yields_stages_as_they_complete():
+    text = json.dumps(ROADMAP)
+    parser = IncrementalRoadmapParser()
+    seen = []
+    for i in range(0, len(text), 7):
+        for stage in parser.feed(text[i : i + 7]):
+            seen.append((stage["title"], i + 7))
+
+    assert [title for title, _ in seen] == ["B.Tech in CSE", "Internships"]
+    # The first stage arrives within one chunk of its closing brace, long before the end.
+    assert seen[0][1] - (text.index("}") + 1) < 7
+    assert parser.stage_count == 2
+    assert parser.result() == parse_roadmap(text)
+
+
+def test_incremental_parser_ignores_braces_inside_strings():
+    data = dict(ROADMAP, next_stages=[{"title": "Learn {JSON} [basics]", "description": "}"}])
+    parser = IncrementalRoadmapParser()
+    stages = parser.feed("Sure! " + json.dumps(data))
+    assert [s["title"] for s in stages] == ["Learn {JSON} [basics]"]
+
+
+def test_incremental_parser_skips_invalid_stages():
+    text = '{"next_stages": [{"title": 1, "x": {}}, {"nope": true}, {"title": "Real"}]}'
+    parser = IncrementalRoadmapParser()
+    assert [s["title"] for s in parser.feed(text)] == ["1", "Real"]
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+def test_do_runs_once_for_concurrent_callers():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait(2)
+        return "answer"
+
+    results = []
+
+    def caller():
+        results.append(flight.do("key", work))
+
+    leader = threading.Thread(target=caller)
+    leader.start()
+    started.wait(2)
+    followers = [threading.Thread(target=caller) for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(2)
+
+    assert len(calls) == 1
+    assert sorted(results) == [("answer", False)] + [("answer", True)] * 4
+    stats = flight.stats()
+    assert stats["calls"] == 5
+    assert stats["coalesced"] == 4
+
+
+def test_do_shares_the_leaders_exception_and_forgets_the_key():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("key", fail)
+    # The failed call is not remembered; the next caller runs again.
+    assert flight.do("key", lambda: 42) == (42, False)
+
+
+def test_do_async_coalesces_and_survives_a_cancelled_caller():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do_async("key", work))
+        second = asyncio.ensure_future(flight.do_async("key", work))
+        await asyncio.sleep(0.01)
+        # Cancelling the leader's caller must not cancel the shared call.
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == ("answer", True)
+    assert len(calls) == 1
+
+
+def test_do_stream_replays_chunks_to_late_readers():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def produce():
+        yield "a"
+        release.wait(2)
+        yield "b"
+        yield "c"
+
+    first, shared_first = flight.do_stream("key", produce)
+    assert next(first) == "a"
+    second, shared_second = flight.do_stream("key", produce)
+    release.set()
+
+    assert (shared_first, shared_second) == (False, True)
+    assert list(first) == ["b", "c"]
+    assert list(second) == ["a", "b", "c"]
+
+
+def test_do_stream_reraises_producer_errors():
+    flight = SingleFlight()
+
+    def produce():
+        yield "a"
+        raise RuntimeError("stream broke")
+
+    reader, _ = flight.do_stream("key", produce)
+    assert next(reader) == "a"
+    with pytest.raises(RuntimeError):
+        next(reader)
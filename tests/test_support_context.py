@@ -0,0 +1,84 @@
+from resume import empty_profile
+from support_context import (
+    EMERGENCY_FOOTER,
+    SupportContextWindow,
+    add_emergency_footer,
+    mentions_self_harm,
+)
+from token_estimate import estimate_message_tokens
+
+
+def _history(count, words=60):
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"Message number {i}. " + "word " * words}
+        for i in range(count)
+    ]
+
+
+def test_short_history_is_sent_verbatim():
+    window = SupportContextWindow(budget=2500, recent_messages=6)
+    history = _history(4, words=5)
+    messages = window.build_messages(empty_profile(), history, "I feel better today")
+
+    assert messages[0]["role"] == "system"
+    assert messages[1:-1] == [{"role": m["role"], "content": m["content"]} for m in history]
+    assert messages[-1] == {"role": "user", "content": "I feel better today"}
+    assert window.folded == 0
+    assert "summary" not in messages[0]["content"]
+
+
+def test_only_recent_messages_are_kept_and_older_ones_are_summarized():
+    window = SupportContextWindow(budget=2500, recent_messages=4)
+    history = _history(10, words=5)
+    messages = window.build_messages(empty_profile(), history, "new")
+
+    assert [m["content"] for m in messages[1:-1]] == [m["content"] for m in history[-4:]]
+    assert window.folded == 6
+    assert "Earlier in this conversation (summary):" in messages[0]["content"]
+    assert "She shared: Message number 0." in messages[0]["content"]
+    assert "You replied: Message number 1." in messages[0]["content"]
+
+
+def test_budget_is_kept_by_folding_more_turns():
+    window = SupportContextWindow(budget=600, recent_messages=6)
+    messages = window.build_messages(empty_profile(), _history(20), "new")
+
+    assert estimate_message_tokens(messages) <= 600
+    assert len(messages) < 8
+    assert messages[-1]["content"] == "new"
+
+
+def test_summary_is_capped_to_its_share_of_the_budget():
+    window = SupportContextWindow(budget=400, recent_messages=2)
+    window.build_messages(empty_profile(), _history(40, words=5), "new")
+
+    # Oldest summary lines are dropped first.
+    assert window.summary_lines
+    assert not any("Message number 0." in line for line in window.summary_lines)
+
+
+def test_each_turn_is_summarized_once():
+    window = SupportContextWindow(budget=2500, recent_messages=2)
+    history = _history(6, words=5)
+    window.build_messages(empty_profile(), history, "a")
+    history += _history(2, words=5)
+    window.build_messages(empty_profile(), history, "b")
+
+    assert len(window.summary_lines) == window.folded == 6
+
+
+def test_cleared_history_resets_the_window():
+    window = SupportContextWindow(budget=2500, recent_messages=2)
+    window.build_messages(empty_profile(), _history(8, words=5), "a")
+    assert window.folded == 6
+
+    messages = window.build_messages(empty_profile(), [], "starting over")
+    assert window.folded == 0
+    assert window.summary_lines == []
+    assert len(messages) == 2
+
+
+def test_self_harm_footer():
+    assert mentions_self_harm("Sometimes I want to END MY LIFE")
+    assert not mentions_self_harm("I am stressed about exams")
+    assert add_emergency_footer("Reply").endswith(EMERGENCY_FOOTER)
@@ -0,0 +1,123 @@
+import functools
+from dataclasses import dataclass
+from typing import List
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+
+@functools.lru_cache(maxsize=16384)
+def word_width(word: str, font_name: str, font_size: float) -> float:
+    """
+    Cached width of a single word. ReportLab widths are plain sums of glyph widths,
+    so a line's width is the sum of its words plus the spaces between them.
+    """
+    return stringWidth(word, font_name, font_size)
+
+
+@dataclass
+class Line:
+    text: str
+    width: float
+    # Extra space added to every space character when the line is justified.
+    word_space: float = 0.0
+
+
+class TextWrapper:
+    """
+    Greedy line breaking for one font and size.
+
+    Each word is measured once (cached across calls) and a running sum of widths
+    decides where lines break, so wrapping is linear in paragraph length instead of
+    re-measuring the whole line for every added word.
+    """
+
+    def __init__(
+        self,
+        font_name: str = "Helvetica",
+        font_size: float = 11,
+        justify: bool = False,
+        hyphenate: bool = False,
+    ):
+        self.font_name = font_name
+        self.font_size = font_size
+        self.justify = justify
+        self.hyphenate = hyphenate
+        self.space_width = word_width(" ", font_name, font_size)
+
+    def width_of(self, word: str) -> float:
+        return word_width(word, self.font_name, self.font_size)
+
+    def _split_long_word(self, word: str, max_width: float) -> List[str]:
+        """
+        Break a word that cannot fit on any line into hyphenated pieces.
+        """
+        hyphen = self.width_of("-")
+        pieces: List[str] = []
+        current = ""
+        current_width = 0.0
+        for ch in word:
+            ch_width = self.width_of(ch)
+            if current and current_width + ch_width + hyphen >= max_width:
+                pieces.append(current + "-")
+                current, current_width = "", 0.0
+            current += ch
+            current_width += ch_width
+        pieces.append(current)
+        return pieces
+
+    def _words(self, text: str, max_width: float) -> List[str]:
+        words = text.split()
+        if not self.hyphenate:
+            return words
+        out: List[str] = []
+        for w in words:
+            if self.width_of(w) >= max_width:
+                out.extend(self._split_long_word(w, max_width))
+            else:
+                out.append(w)
+        return out
+
+    def layout(self, text: str, max_width: float) -> List[Line]:
+        """
+        Break one paragraph (no newlines) into lines narrower than max_width.
+        A single word wider than max_width gets its own line unless hyphenate is on.
+        """
+        words = self._words(text, max_width)
+        if not words:
+            return [Line("", 0.0)]
+
+        lines: List[Line] = []
+        cur_words = [words[0]]
+        cur_width = self.width_of(words[0])
+        for w in words[1:]:
+            w_width = self.width_of(w)
+            candidate = cur_width + self.space_width + w_width
+            if candidate < max_width:
+                cur_words.append(w)
+                cur_width = candidate
+            else:
+                lines.append(self._make_line(cur_words, cur_width, max_width))
+                cur_words = [w]
+                cur_width = w_width
+        # The last line of a paragraph is never stretched.
+        lines.append(Line(" ".join(cur_words), cur_width))
+        return lines
+
+    def _make_line(self, words: List[str], width: float, max_width: float) -> Line:
+        text = " ".join(words)
+        if not self.justify or len(words) < 2:
+            return Line(text, width)
+        return Line(text, width, (max_width - width) / (len(words) - 1))
+
+    def wrap(self, text: str, max_width: float) -> List[str]:
+        return [line.text for line in self.layout(text, max_width)]
+
+    def draw_line(self, canv, x: float, y: float, line: Line) -> None:
+        if not line.word_space:
+            canv.drawString(x, y, line.text)
+            return
+        text_obj = canv.beginText(x, y)
+        text_obj.setFont(self.font_name, self.font_size)
+        text_obj.setWordSpace(line.word_space)
+        text_obj.textOut(line.text)
+        canv.drawText(text_obj)
@@ -0,0 +1,20 @@
+import re
+
+_WORD_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough local token count for Llama-style BPE vocabularies, no tokenizer download needed.
+    Takes the larger of ~4 characters per token and ~1.3 tokens per word/punctuation mark,
+    which errs on the high side for both plain English and Indian-language text.
+    """
+    if not text:
+        return 0
+    pieces = len(_WORD_RE.findall(text))
+    return max(len(text) // 4, int(pieces * 1.3)) + 1
+
+
+def estimate_message_tokens(messages) -> int:
+    # ~4 tokens of per-message overhead for role markers
+    return sum(estimate_tokens(m.get("content", "")) + 4 for m in messages)